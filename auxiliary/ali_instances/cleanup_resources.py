@@ -3,16 +3,19 @@ from __future__ import annotations
 
 import argparse
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
 from alibabacloud_ecs20140526 import models as ecs_models
 from loguru import logger
 
 from .config import EcsRuntimeConfig, DEFAULT_COMMON_TAG_KEY, DEFAULT_COMMON_TAG_VALUE, DEFAULT_USER_TAG_KEY, DEFAULT_USER_TAG_VALUE
-from .instance_prep import delete_instance
 from .config import client
+from cloud_provisioner.aliyun_provider.instance import delete_instance_chunk
+from utils.wait_until import WaitUntilTimeoutError, wait_until
 
 
 @dataclass
@@ -33,10 +36,14 @@ def _list_regions(cfg: EcsRuntimeConfig) -> List[str]:
     return [r.region_id for r in resp.body.regions.region if r.region_id]
 
 
-def _iter_instances(c, region_id: str):
+def _iter_instances(c, region_id: str, tags: Optional[Dict[str, str]] = None):
+    # Tag filters are applied server-side so only matching instances cross the wire.
+    req_tags = [ecs_models.DescribeInstancesRequestTag(key=k, value=v) for k, v in (tags or {}).items()] or None
     page = 1
     while True:
-        resp = c.describe_instances(ecs_models.DescribeInstancesRequest(region_id=region_id, page_size=100, page_number=page))
+        resp = c.describe_instances(
+            ecs_models.DescribeInstancesRequest(region_id=region_id, page_size=100, page_number=page, tag=req_tags)
+        )
         items = resp.body.instances.instance if resp.body and resp.body.instances else []
         if not items:
             break
@@ -47,6 +54,96 @@ def _iter_instances(c, region_id: str):
         page += 1
 
 
+def _fan_out(fn: Callable[[str], None], resource_ids: List[str], max_workers: int = 8) -> None:
+    if not resource_ids:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(resource_ids))) as executor:
+        list(executor.map(fn, resource_ids))
+
+
+def _existing_instance_ids(c, region_id: str, instance_ids: List[str]) -> List[str]:
+    existing: List[str] = []
+    for i in range(0, len(instance_ids), 100):
+        resp = c.describe_instances(
+            ecs_models.DescribeInstancesRequest(region_id=region_id, page_size=100, instance_ids=json.dumps(instance_ids[i:i + 100]))
+        )
+        items = resp.body.instances.instance if resp.body and resp.body.instances else []
+        existing.extend(inst.instance_id for inst in items if inst.instance_id)
+    return existing
+
+
+def _wait_instances_released(c, region_id: str, instance_ids: List[str], *, timeout: int = 180, poll: int = 3) -> None:
+    """Poll until deleted instances disappear so their security groups can be removed."""
+    pending = list(instance_ids)
+
+    def released() -> bool:
+        nonlocal pending
+        pending = _existing_instance_ids(c, region_id, pending)
+        return not pending
+
+    try:
+        wait_until(released, timeout=timeout, retry_interval=poll)
+    except WaitUntilTimeoutError:
+        logger.warning(f"{len(pending)} instances in {region_id} not released after {timeout}s: {pending}")
+    except Exception as exc:
+        logger.warning(f"failed to wait for instances in {region_id} to be released: {exc}")
+
+
+def _delete_listed_instances(c, region_id: str, instance_ids: List[str], *, max_attempts: int = 5) -> List[str]:
+    deleted: List[str] = []
+    for i in range(0, len(instance_ids), 100):
+        chunk = instance_ids[i:i + 100]
+        if delete_instance_chunk(c, region_id, chunk, max_attempts=max_attempts):
+            deleted.extend(chunk)
+            logger.info(f"deleted {len(chunk)} instances in {region_id}: {chunk}")
+            continue
+        # DeleteInstances rejects the whole batch for a single bad instance; retry the ids one by one
+        # so the healthy ones are not left running.
+        logger.warning(f"batch delete failed in {region_id}, falling back to per-instance delete for {len(chunk)} instances")
+        for instance_id in chunk:
+            if delete_instance_chunk(c, region_id, [instance_id], max_attempts=max_attempts):
+                deleted.append(instance_id)
+                logger.info(f"deleted instance {instance_id} in {region_id}")
+            else:
+                logger.warning(f"failed to delete instance {instance_id} in {region_id}")
+    return deleted
+
+
+def _list_security_groups(c, region_id: str, prefix: str) -> List[str]:
+    sg_resp = c.describe_security_groups(
+        ecs_models.DescribeSecurityGroupsRequest(region_id=region_id, page_size=50)
+    )
+    sgs = sg_resp.body.security_groups.security_group if sg_resp.body and sg_resp.body.security_groups else []
+    return [
+        sg.security_group_id
+        for sg in sgs
+        if sg.security_group_name and sg.security_group_id and sg.security_group_name.startswith(prefix)
+    ]
+
+
+def _delete_security_group(c, region_id: str, sg_id: str, *, max_attempts: int = 4) -> None:
+    for attempt in range(max_attempts):
+        try:
+            c.delete_security_group(ecs_models.DeleteSecurityGroupRequest(region_id=region_id, security_group_id=sg_id))
+            logger.info(f"deleted security group {sg_id}")
+            return
+        except Exception as exc:
+            # Detaching a security group can lag behind instance release.
+            if "DependencyViolation" in str(exc) and attempt < max_attempts - 1:
+                time.sleep(2 ** (attempt + 1))
+                continue
+            logger.warning(f"failed to delete security group {sg_id}: {exc}")
+            return
+
+
+def _delete_vswitch(c, region_id: str, vsw_id: str) -> None:
+    try:
+        c.delete_vswitch(ecs_models.DeleteVSwitchRequest(region_id=region_id, v_switch_id=vsw_id))
+        logger.info(f"deleted vswitch {vsw_id}")
+    except Exception as exc:
+        logger.warning(f"failed to delete vswitch {vsw_id}: {exc}")
+
+
 def cleanup_all_regions(
     *,
     regions: Optional[List[str]] = None,
@@ -65,8 +162,6 @@ def cleanup_all_regions(
     tag_filter = TagFilter(common_key=common_tag, common_value=common_tag_value, user_key=user_tag_key, user_value=user_tag)
     prefix = name_prefix or f"{common_tag}-{user_tag}"
 
-    total_deleted = 0
-    observed_user_pairs: set[tuple[str, Optional[str]]] = set()
     regions = [
         "cn-wulanchabu",
         "ap-southeast-5",  # Indonesia
@@ -78,55 +173,48 @@ def cleanup_all_regions(
         "me-east-1",  
     ]
 
-    for region_id in regions:
+    def _cleanup_region(region_id: str) -> tuple[int, set[tuple[str, Optional[str]]]]:
+        observed: set[tuple[str, Optional[str]]] = set()
         logger.info(f"cleanup region {region_id}")
         c = client(cfg.credentials, region_id)
+        matched_ids: List[str] = []
 
         try:
-            # Delete instances by tags
-            for inst in _iter_instances(c, region_id):
+            # Collect instances by tags
+            # Only the common tag is pushed down: observed user tags are reported for all common-tagged instances.
+            for inst in _iter_instances(c, region_id, {tag_filter.common_key: tag_filter.common_value}):
                 tags = inst.tags.tag if inst.tags else []
                 # record instances that have the common tag (regardless of user tag value)
                 tag_map = {t.tag_key: t.tag_value for t in tags if t.tag_key}
                 if tag_map.get(tag_filter.common_key) == tag_filter.common_value:
-                    observed_user_pairs.add((user_tag_key, tag_map.get(user_tag_key)))
+                    observed.add((user_tag_key, tag_map.get(user_tag_key)))
 
                 if not tag_filter.matches(tags):
                     continue
                 if not inst.instance_id:
                     continue
-                try:
-                    delete_instance(c, region_id, inst.instance_id)
-                    total_deleted += 1
-                    logger.info(f"deleted instance {inst.instance_id} in {region_id}")
-                except Exception as exc:
-                    logger.warning(f"failed to delete instance {inst.instance_id}: {exc}")
+                matched_ids.append(inst.instance_id)
         except Exception as exc:
-            logger.warning(f"failed to list/delete instances in {region_id}: {exc}")
+            logger.warning(f"failed to list instances in {region_id}: {exc}")
+
+        # The listing already proves these exist, so skip the per-instance describe and delete in batches.
+        deleted_ids = _delete_listed_instances(c, region_id, matched_ids)
+
+        # Listing security groups does not depend on the instances being gone; overlap it with the release wait.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            sg_future = executor.submit(_list_security_groups, c, region_id, prefix)
+            if deleted_ids:
+                _wait_instances_released(c, region_id, deleted_ids)
 
         # Best-effort cleanup of security groups with the same prefix
         try:
-            sg_resp = c.describe_security_groups(
-                ecs_models.DescribeSecurityGroupsRequest(region_id=region_id, page_size=50)
-            )
-            sgs = sg_resp.body.security_groups.security_group if sg_resp.body and sg_resp.body.security_groups else []
-            for sg in sgs:
-                if not sg.security_group_name or not sg.security_group_id:
-                    continue
-                if not sg.security_group_name.startswith(prefix):
-                    continue
-                try:
-                    c.delete_security_group(
-                        ecs_models.DeleteSecurityGroupRequest(region_id=region_id, security_group_id=sg.security_group_id)
-                    )
-                    logger.info(f"deleted security group {sg.security_group_id}")
-                except Exception as exc:
-                    logger.warning(f"failed to delete security group {sg.security_group_id}: {exc}")
+            sg_ids = sg_future.result()
+            _fan_out(lambda sg_id: _delete_security_group(c, region_id, sg_id), sg_ids)
         except Exception as exc:
             logger.warning(f"failed to list/delete security groups in {region_id}: {exc}")
 
         if not delete_network:
-            continue
+            return len(deleted_ids), observed
         # Best-effort cleanup of vpcs/vswitches with the same prefix
         # try-catch is needed
         try:
@@ -142,16 +230,9 @@ def cleanup_all_regions(
                         ecs_models.DescribeVSwitchesRequest(region_id=region_id, vpc_id=vpc.vpc_id, page_size=50)
                     )
                     vsws = vsw_resp.body.v_switches.v_switch if vsw_resp.body and vsw_resp.body.v_switches else []
-                    for vsw in vsws:
-                        if not vsw.v_switch_id:
-                            continue
-                        try:
-                            c.delete_vswitch(
-                                ecs_models.DeleteVSwitchRequest(region_id=region_id, v_switch_id=vsw.v_switch_id)
-                            )
-                            logger.info(f"deleted vswitch {vsw.v_switch_id}")
-                        except Exception as exc:
-                            logger.warning(f"failed to delete vswitch {vsw.v_switch_id}: {exc}")
+                    vsw_ids = [vsw.v_switch_id for vsw in vsws if vsw.v_switch_id]
+                    # All vswitches must be gone before the VPC itself can be deleted.
+                    _fan_out(lambda vsw_id: _delete_vswitch(c, region_id, vsw_id), vsw_ids)
 
                     c.delete_vpc(ecs_models.DeleteVpcRequest(region_id=region_id, vpc_id=vpc.vpc_id))
                     logger.info(f"deleted vpc {vpc.vpc_id}")
@@ -159,6 +240,24 @@ def cleanup_all_regions(
                     logger.warning(f"failed to delete vpc {vpc.vpc_id}: {exc}")
         except Exception as exc:
             logger.warning(f"failed to list/delete vpcs in {region_id}: {exc}")
+        return len(deleted_ids), observed
+
+    def _cleanup_region_safely(region_id: str) -> tuple[int, set[tuple[str, Optional[str]]]]:
+        # executor.map re-raises the first failure, so keep one broken region from aborting the others.
+        try:
+            return _cleanup_region(region_id)
+        except Exception as exc:
+            logger.warning(f"failed to clean up region {region_id}: {exc}")
+            return 0, set()
+
+    # Regions are independent endpoints; clean them concurrently so the wall time is the slowest region.
+    with ThreadPoolExecutor(max_workers=max(1, len(regions))) as executor:
+        region_results = list(executor.map(_cleanup_region_safely, regions))
+
+    # Regions only report how many instances they deleted; the ids are not needed past the release wait.
+    total_deleted = sum(deleted_count for deleted_count, _ in region_results)
+    observed_user_pairs: set[tuple[str, Optional[str]]] = set().union(*(observed for _, observed in region_results))
+
     # If we deleted nothing, print observed user tag values for instances that had the common tag
     if total_deleted == 0:
         if observed_user_pairs:
@@ -183,23 +282,32 @@ def cleanup_from_json(
 
     cfg = EcsRuntimeConfig(credentials=credentials or EcsRuntimeConfig().credentials)
     by_region: Dict[str, List[str]] = {}
+    # An instance listed more than once would otherwise be described and deleted once per entry.
+    seen: set[str] = set()
     for h in hosts:
         region = h.region
         instance_id = h.instance_id
         if not region or not instance_id:
             logger.warning(f"skip entry without region/instance_id: {h}")
             continue
+        if instance_id in seen:
+            continue
+        seen.add(instance_id)
         by_region.setdefault(region, []).append(instance_id)
 
-    for region_id, instance_ids in by_region.items():
+    def _cleanup_region(region_id: str, instance_ids: List[str]) -> None:
         logger.info(f"cleanup instances in region {region_id}")
         c = client(cfg.credentials, region_id)
-        for iid in instance_ids:
-            try:
-                delete_instance(c, region_id, iid)
-                logger.info(f"deleted instance {iid} in {region_id}")
-            except Exception as exc:
-                logger.warning(f"failed to delete instance {iid}: {exc}")
+        # DeleteInstances rejects the whole batch on an unknown id, so drop already-released ones first.
+        try:
+            existing = _existing_instance_ids(c, region_id, instance_ids)
+        except Exception as exc:
+            logger.warning(f"failed to describe instances in {region_id}: {exc}")
+            return
+        _delete_listed_instances(c, region_id, existing)
+
+    with ThreadPoolExecutor(max_workers=max(1, len(by_region))) as executor:
+        list(executor.map(_cleanup_region, by_region.keys(), by_region.values()))
 
 
 if __name__ == "__main__":
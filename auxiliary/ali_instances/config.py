@@ -1,7 +1,8 @@
 """Aliyun ECS configuration and client helpers."""
 from dataclasses import dataclass, field
 import os
-from typing import List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 
 from alibabacloud_ecs20140526.client import Client as EcsClient
 from alibabacloud_tea_openapi.models import Config as AliyunOpenApiConfig
@@ -103,12 +104,23 @@ def load_credentials() -> AliCredentials:
     return AliCredentials(ak, sk)
 
 
+_CLIENTS: Dict[Tuple[str, str, str], EcsClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
 def client(creds: AliCredentials, region: str) -> EcsClient:
-    config = AliyunOpenApiConfig(
-        access_key_id=creds.access_key_id,
-        access_key_secret=creds.access_key_secret,
-        region_id=region,
-        read_timeout=120_000,
-        connect_timeout=120_000,
-    )
-    return EcsClient(config)
+    # Reuse one SDK client per credentials and region; callers ask for it on every request.
+    key = (creds.access_key_id, creds.access_key_secret, region)
+    with _CLIENTS_LOCK:
+        c = _CLIENTS.get(key)
+        if c is None:
+            config = AliyunOpenApiConfig(
+                access_key_id=creds.access_key_id,
+                access_key_secret=creds.access_key_secret,
+                region_id=region,
+                read_timeout=120_000,
+                connect_timeout=120_000,
+            )
+            c = EcsClient(config)
+            _CLIENTS[key] = c
+        return c
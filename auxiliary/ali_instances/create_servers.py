@@ -5,6 +5,7 @@ from __future__ import annotations
 import argparse
 import datetime
 import json
+import os
 from pathlib import Path
 from typing import Iterable, Dict, Any
 
@@ -73,8 +74,12 @@ def write_inventory(
         "hosts": [serialize_host(h) for h in hosts],
     }
     log_dir.mkdir(parents=True, exist_ok=True)
-    (log_dir / "ali_servers.json").write_text(json.dumps(data, ensure_ascii=False, indent=2))
-    (root / "ali_servers.json").write_text(json.dumps(data, ensure_ascii=False, indent=2))
+    # Serialize once; the root copy is what later runs read, so swap it in atomically.
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    (log_dir / "ali_servers.json").write_text(text)
+    tmp_path = root / "ali_servers.json.tmp"
+    tmp_path.write_text(text)
+    os.replace(tmp_path, root / "ali_servers.json")
 
 
 def main() -> None:
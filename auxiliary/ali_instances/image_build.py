@@ -1,5 +1,6 @@
 """Server image building utilities for Aliyun ECS."""
 import asyncio
+import os
 import shlex
 import time
 from pathlib import Path
@@ -10,6 +11,7 @@ from alibabacloud_ecs20140526 import models as ecs_models
 from alibabacloud_ecs20140526.client import Client as EcsClient
 from loguru import logger
 
+from utils.ssh_connect import connect_ssh
 from utils.wait_until import wait_until
 from .config import AliCredentials, EcsRuntimeConfig, InstanceTypeConfig, client
 from .instance_prep import (
@@ -20,7 +22,6 @@ from .instance_prep import (
     ensure_net,
     start_instance,
     stop_instance,
-    wait_ssh,
     wait_running,
     wait_status,
 )
@@ -108,7 +109,7 @@ def find_img_in_regions(
     return None
 
 
-async def ensure_image_in_region(
+async def submit_image_in_region(
     *,
     creds: AliCredentials,
     region: str,
@@ -116,28 +117,30 @@ async def ensure_image_in_region(
     search_regions: Sequence[str],
     poll_interval: int,
     wait_timeout: int,
-) -> str:
+    source: Optional[Tuple[str, str]] = None,
+) -> Tuple[str, bool]:
+    """Find or start copying the image into ``region``; returns (image_id, available)."""
+    # The SDK calls below are blocking; run them in worker threads so that the
+    # per-region coroutines gathered by ensure_images_in_regions overlap.
     c = client(creds, region)
-    existing = find_img_info(c, region, image_name)
+    existing = await asyncio.to_thread(find_img_info, c, region, image_name)
     if existing:
         image_id, status = existing
-        if status != "Available":
-            await wait_images_available({(region, image_id): c}, poll_interval, wait_timeout)
-        return image_id
-
-    lookup_regions = [r for r in search_regions if r]
-    if region not in lookup_regions:
-        lookup_regions.append(region)
+        return image_id, status == "Available"
 
-    found = find_img_in_regions(creds, lookup_regions, image_name)
+    found = source
+    if found is None:
+        lookup_regions = list(dict.fromkeys(r for r in (*search_regions, region) if r))
+        found = await asyncio.to_thread(find_img_in_regions, creds, lookup_regions, image_name)
     if not found:
         raise RuntimeError(f"image {image_name} not found in any region")
     src_region, src_image_id = found
     if src_region == region:
-        return src_image_id
+        return src_image_id, True
 
     logger.info(f"copying image {image_name} from {src_region} to {region}")
-    image_id = _copy_image(
+    image_id = await asyncio.to_thread(
+        _copy_image,
         creds=creds,
         src_region=src_region,
         dest_region=region,
@@ -146,7 +149,30 @@ async def ensure_image_in_region(
         poll_interval=poll_interval,
         wait_timeout=wait_timeout,
     )
-    wait_img(c, region, image_id, poll_interval, wait_timeout)
+    return image_id, False
+
+
+async def ensure_image_in_region(
+    *,
+    creds: AliCredentials,
+    region: str,
+    image_name: str,
+    search_regions: Sequence[str],
+    poll_interval: int,
+    wait_timeout: int,
+    source: Optional[Tuple[str, str]] = None,
+) -> str:
+    image_id, available = await submit_image_in_region(
+        creds=creds,
+        region=region,
+        image_name=image_name,
+        search_regions=search_regions,
+        poll_interval=poll_interval,
+        wait_timeout=wait_timeout,
+        source=source,
+    )
+    if not available:
+        await wait_images_available({(region, image_id): client(creds, region)}, poll_interval, wait_timeout)
     return image_id
 
 
@@ -214,7 +240,7 @@ async def wait_images_available(
             raise RuntimeError("timeout waiting for image copies")
         done: list[tuple[str, str]] = []
         for (region, image_id), c in pending.items():
-            resp = c.describe_images(ecs_models.DescribeImagesRequest(region_id=region, image_id=image_id))
+            resp = await asyncio.to_thread(c.describe_images, ecs_models.DescribeImagesRequest(region_id=region, image_id=image_id))
             imgs = resp.body.images.image if resp.body and resp.body.images else []
             if not imgs:
                 continue
@@ -239,10 +265,11 @@ def ensure_images_in_regions(
     poll_interval: int,
     wait_timeout: int,
 ) -> dict[str, str]:
-    region_list = [r for r in target_regions if r]
+    # dict.fromkeys dedups in order; a duplicated target would otherwise submit two copies.
+    region_list = list(dict.fromkeys(r for r in target_regions if r))
     if not region_list:
         return {}
-    lookup_regions = [r for r in (search_regions or region_list) if r]
+    lookup_regions = list(dict.fromkeys(r for r in (search_regions or region_list) if r))
     image_map: dict[str, str] = {}
 
     found = find_img_in_regions(creds, lookup_regions, image_name)
@@ -256,32 +283,48 @@ def ensure_images_in_regions(
             wait_timeout=wait_timeout,
         )
         image_map[build_region] = built_id
-        if build_region not in lookup_regions:
-            lookup_regions.append(build_region)
+        lookup_regions = list(dict.fromkeys((*lookup_regions, build_region)))
+        found = (build_region, built_id)
     else:
         src_region, src_image_id = found
         image_map[src_region] = src_image_id
 
     async def _ensure_all() -> dict[str, str]:
+        # Submit every copy first, then wait for all of them in one polling loop.
         tasks = [
-            ensure_image_in_region(
+            submit_image_in_region(
                 creds=creds,
                 region=region,
                 image_name=image_name,
                 search_regions=lookup_regions,
                 poll_interval=poll_interval,
                 wait_timeout=wait_timeout,
+                # Every region copies from the same source; don't look it up again per region.
+                source=found,
             )
             for region in region_list
         ]
         results = await asyncio.gather(*tasks)
-        return {region: image_id for region, image_id in zip(region_list, results)}
+        pending = {
+            (region, image_id): client(creds, region)
+            for region, (image_id, available) in zip(region_list, results)
+            if not available
+        }
+        await wait_images_available(pending, poll_interval, wait_timeout)
+        return {region: image_id for region, (image_id, _) in zip(region_list, results)}
 
     image_map.update(asyncio.run(_ensure_all()))
     return image_map
 
 
+# region -> selected system Ubuntu image id; the paged search costs up to max_pages API calls.
+_ubuntu_image_cache: dict[str, str] = {}
+
+
 def find_ubuntu(c: EcsClient, r: str, max_pages: int = 5, page_size: int = 50) -> str:
+    cached = _ubuntu_image_cache.get(r)
+    if cached:
+        return cached
     candidates: list[ecs_models.DescribeImagesResponseBodyImagesImage] = []
     page_number = 1
     while page_number <= max_pages:
@@ -328,6 +371,7 @@ def find_ubuntu(c: EcsClient, r: str, max_pages: int = 5, page_size: int = 50) -
     if not chosen.image_id:
         raise RuntimeError("ubuntu image missing image_id")
     logger.info(f"selected ubuntu image: {chosen.image_id} ({chosen.image_name})")
+    _ubuntu_image_cache[r] = chosen.image_id
     return chosen.image_id
 
 
@@ -347,9 +391,10 @@ def wait_img(c: EcsClient, r: str, img: str, poll: int, timeout: int) -> None:
 
 
 async def prepare_docker_server_image(host: str, cfg: EcsRuntimeConfig) -> None:
-    await wait_ssh(host, cfg.ssh_username, cfg.ssh_private_key_path, cfg.wait_timeout)
     key_path = str(Path(cfg.ssh_private_key_path).expanduser())
-    async with asyncssh.connect(host, username=cfg.ssh_username, client_keys=[key_path], known_hosts=None) as conn:
+    # Keep the connection that proved SSH is up instead of handshaking twice.
+    conn = await connect_ssh(host, cfg.ssh_username, key_path, cfg.wait_timeout)
+    async with conn:
         async def run(cmd: str, check: bool = True) -> None:
             logger.info(f"remote: {cmd}")
             r = await conn.run(cmd, check=False)
@@ -365,8 +410,9 @@ async def prepare_docker_server_image(host: str, cfg: EcsRuntimeConfig) -> None:
             raise FileNotFoundError(f"prepare script not found: {prepare_script}")
         remote_prepare = f"/tmp/{prepare_script.name}.{int(time.time())}.sh"
         await asyncssh.scp(str(prepare_script), (conn, remote_prepare))
-        await run(f"sudo bash {shlex.quote(remote_prepare)}")
-        await run(f"sudo rm -f {shlex.quote(remote_prepare)}")
+        # Run and remove the script in one round-trip, keeping the script's exit status.
+        q = shlex.quote(remote_prepare)
+        await run(f"sudo bash {q}; rc=$?; sudo rm -f {q}; exit $rc")
 
 
 def create_server_image(
@@ -396,6 +442,11 @@ def create_server_image(
     cfg.instance_type = [InstanceTypeConfig(name=selected_type)]
     ensure_net(c, cfg)
     ensure_keypair(c, cfg.region_id, cfg.key_pair_name, cfg.ssh_private_key_path)
+    # The keypair may already exist remotely while the local key is missing; without it the
+    # builder would only fail after the full SSH wait timeout.
+    key_file = Path(cfg.ssh_private_key_path).expanduser()
+    if not key_file.is_file() or not os.access(key_file, os.R_OK):
+        raise ValueError(f"ssh_private_key_path is required for image building: {key_file} is not readable")
     iid = ""
     try:
         cfg.image_id = base_image_id
@@ -407,10 +458,12 @@ def create_server_image(
                 start_instance(c, iid)
             except Exception as exc:
                 logger.warning(f"start_instance failed for {iid}: {exc}. Will wait for instance to become Running.")
-        wait_status(c, cfg.region_id, iid, ["Running"], cfg.poll_interval, cfg.wait_timeout)
-        allocate_public_ip(c, cfg.region_id, iid, cfg.poll_interval, cfg.wait_timeout)
-        ip = wait_running(c, cfg.region_id, iid, cfg.poll_interval, cfg.wait_timeout)
-        logger.info(f"builder ready: {ip}")
+        # The public IP can be allocated before the instance reports Running; SSH
+        # reachability in prepare_fn is the real readiness signal.
+        ip = allocate_public_ip(c, cfg.region_id, iid, cfg.poll_interval, cfg.wait_timeout)
+        if not ip:
+            ip = wait_running(c, cfg.region_id, iid, cfg.poll_interval, cfg.wait_timeout)
+        logger.info(f"builder ip: {ip}")
         asyncio.run(prepare_fn(ip, cfg))
         logger.info("stopping builder instance")
         stop_instance(c, iid, "StopCharging")
@@ -1,5 +1,4 @@
 """Instance preparation and lifecycle helpers for Aliyun ECS."""
-import asyncio
 import copy
 import ipaddress
 import json
@@ -10,29 +9,14 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional, Sequence
 
-import asyncssh
 from alibabacloud_ecs20140526 import models as ecs_models
 from alibabacloud_ecs20140526.client import Client as EcsClient
 from loguru import logger
 
-from utils.wait_until import wait_until
+from utils.wait_until import backoff_delay, wait_until
 from .config import EcsRuntimeConfig, InstanceTypeConfig, client, RUN_INSTANCES_MAX_AMOUNT
 
 
-async def wait_ssh(host: str, user: str, key: str, timeout: int, interval: int = 3) -> None:
-    """Wait until SSH is ready on a host."""
-    deadline = time.time() + timeout
-    while time.time() < deadline:
-        try:
-            conn = await asyncssh.connect(host, username=user, client_keys=[key], known_hosts=None)
-            conn.close()
-            await conn.wait_closed()
-            return
-        except Exception:
-            await asyncio.sleep(interval)
-    raise TimeoutError(f"SSH not ready for {host}")
-
-
 def _tag_dict(cfg: EcsRuntimeConfig) -> dict[str, str]:
     return {
         cfg.common_tag_key: cfg.common_tag_value,
@@ -52,8 +36,12 @@ def _tag_resource(c: EcsClient, r: str, resource_type: str, resource_id: str, ta
     )
 
 
-def _instance_info(c: EcsClient, r: str, iid: str) -> tuple[Optional[str], Optional[str]]:
-    resp = c.describe_instances(ecs_models.DescribeInstancesRequest(region_id=r, instance_ids=json.dumps([iid])))
+def _instance_info_request(r: str, iid: str) -> ecs_models.DescribeInstancesRequest:
+    return ecs_models.DescribeInstancesRequest(region_id=r, instance_ids=json.dumps([iid]))
+
+
+def _instance_info(c: EcsClient, req: ecs_models.DescribeInstancesRequest) -> tuple[Optional[str], Optional[str]]:
+    resp = c.describe_instances(req)
     instances = resp.body.instances.instance if resp.body and resp.body.instances else []
     if not instances:
         return None, None
@@ -61,11 +49,30 @@ def _instance_info(c: EcsClient, r: str, iid: str) -> tuple[Optional[str], Optio
     return instances[0].status, ips[0] if ips else None
 
 
+# Many instances are polled concurrently per region; these codes mean "slow down", not "failed".
+_THROTTLE_CODE_PREFIXES = ("Throttling", "ServiceUnavailable", "LastTokenProcessing")
+
+
+def _backoff_if_throttled(exc: Exception, h: dict) -> None:
+    code = getattr(exc, "code", None)
+    if not (isinstance(code, str) and code.startswith(_THROTTLE_CODE_PREFIXES)):
+        raise exc
+    time.sleep(backoff_delay(h["throttled"]))
+    h["throttled"] += 1
+
+
 def wait_status(c: EcsClient, r: str, iid: str, want: Sequence[str], poll: int, timeout: int) -> str:
-    h = {"s": None}
+    h = {"s": None, "throttled": 0}
+    # The request is the same on every poll, build it once
+    req = _instance_info_request(r, iid)
 
     def chk() -> bool:
-        h["s"], _ = _instance_info(c, r, iid)
+        try:
+            h["s"], _ = _instance_info(c, req)
+        except Exception as exc:
+            _backoff_if_throttled(exc, h)
+            return False
+        h["throttled"] = 0
         return h["s"] in want
 
     wait_until(chk, timeout=timeout, retry_interval=poll)
@@ -73,10 +80,16 @@ def wait_status(c: EcsClient, r: str, iid: str, want: Sequence[str], poll: int,
 
 
 def wait_running(c: EcsClient, r: str, iid: str, poll: int, timeout: int) -> str:
-    h = {"ip": None}
+    h = {"ip": None, "throttled": 0}
+    req = _instance_info_request(r, iid)
 
     def chk() -> bool:
-        s, ip = _instance_info(c, r, iid)
+        try:
+            s, ip = _instance_info(c, req)
+        except Exception as exc:
+            _backoff_if_throttled(exc, h)
+            return False
+        h["throttled"] = 0
         h["ip"] = ip
         logger.info(f"{iid}: {s}, ip={ip}")
         return s == "Running" and bool(ip)
@@ -94,7 +107,7 @@ def stop_instance(c: EcsClient, iid: str, mode: Optional[str] = None) -> None:
 
 
 def delete_instance(c: EcsClient, r: str, iid: str) -> None:
-    s, _ = _instance_info(c, r, iid)
+    s, _ = _instance_info(c, _instance_info_request(r, iid))
     if s:
         c.delete_instance(ecs_models.DeleteInstanceRequest(instance_id=iid, force=True, force_stop=True))
 
@@ -594,7 +594,8 @@ def provision_aliyun_hosts(
         creds = resolve_aliyun_credentials(account_cfg)
         user_tag = account_cfg.user_tag or DEFAULT_USER_TAG_VALUE
         prefix = f"{common_tag}-{user_tag}"
-        regions_used: List[str] = []
+        # Ordered set of regions touched in this account (dict keeps insertion order).
+        regions_used: Dict[str, None] = {}
 
         active = active_regions(regions)
         image_ids_by_region: Dict[str, str] = {}
@@ -621,8 +622,7 @@ def provision_aliyun_hosts(
                 return await asyncio.gather(*tasks)
 
             for region_name, _ in asyncio.run(_ensure_all_regions()):
-                if region_name not in regions_used:
-                    regions_used.append(region_name)
+                regions_used[region_name] = None
 
         if active and not network_only:
             # Filter instance types with stock for all active regions in parallel.
@@ -673,11 +673,10 @@ def provision_aliyun_hosts(
                 raise RuntimeError("provision cancelled by user")
             for region_name, region_hosts in asyncio.run(_provision_all_regions()):
                 hosts.extend(region_hosts)
-                if region_name not in regions_used:
-                    regions_used.append(region_name)
+                regions_used[region_name] = None
 
         if regions_used:
-            cleanup_targets.append((regions_used, creds, user_tag, prefix))
+            cleanup_targets.append((list(regions_used), creds, user_tag, prefix))
 
     return hosts, cleanup_targets
 
@@ -2,6 +2,7 @@ import subprocess
 import json
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import boto3
 from loguru import logger
@@ -136,13 +137,16 @@ def deregister_image_and_snapshots(image_id: str, aws_region: str = "us-west-2")
     logger.info(f"注销镜像 {image_id}")
     ec2_client.deregister_image(ImageId=image_id)
     
-    # 删除快照
-    for snapshot_id in snapshot_ids:
+    # 删除快照，各快照互不依赖，并行提交
+    def _delete_snapshot(snapshot_id: str):
         logger.info(f"删除快照 {snapshot_id}")
         try:
             ec2_client.delete_snapshot(SnapshotId=snapshot_id)
         except Exception as e:
             logger.error(f"删除快照 {snapshot_id} 失败: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(16, len(snapshot_ids)))) as executor:
+        list(executor.map(_delete_snapshot, snapshot_ids))
     
     logger.info(f"已注销镜像 {image_id} 并删除 {len(snapshot_ids)} 个快照")
 
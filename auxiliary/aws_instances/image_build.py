@@ -31,6 +31,7 @@ import asyncssh
 from loguru import logger
 from dotenv import load_dotenv
 
+from utils.ssh_connect import connect_ssh
 from utils.wait_until import wait_until
 from cloud_provisioner.aws_provider.client_factory import AwsClient
 from cloud_provisioner.create_instances.instance_config import InstanceConfig
@@ -112,20 +113,15 @@ async def _remote_run(conn: asyncssh.SSHClientConnection, cmd: str, *, check: bo
 
 
 async def _connect_with_retry(host: str, *, ssh_user: str, ssh_key_path: str, timeout: int = 300) -> asyncssh.SSHClientConnection:
-    deadline = time.time() + timeout
     key_path = str(Path(ssh_key_path).expanduser())
-    last_exc: Optional[BaseException] = None
-    while time.time() < deadline:
-        try:
-            conn = await asyncssh.connect(host, username=ssh_user, client_keys=[key_path], known_hosts=None)
-            r = await conn.run("true", check=False)
-            if r.exit_status == 0:
-                return conn
-            await conn.wait_closed()
-        except BaseException as exc:
-            last_exc = exc
-        await asyncio.sleep(3)
-    raise RuntimeError(f"SSH not stable for {host} within timeout; last error: {last_exc}")
+    conn = await connect_ssh(host, ssh_user, key_path, timeout)
+    # A fresh sshd may accept the handshake before it can run commands; probe once before use.
+    r = await conn.run("true", check=False)
+    if r.exit_status != 0:
+        conn.close()
+        await conn.wait_closed()
+        raise RuntimeError(f"SSH not stable for {host}: probe exited with {r.exit_status}")
+    return conn
 
 
 def _load_request_config() -> tuple[str, str, str]:
@@ -209,8 +205,10 @@ async def _prepare_registry_builder(host: str, *, ssh_user: str, ssh_key_path: s
     async with conn:
         remote_prepare = f"/tmp/{PREPARE_SCRIPT.name}.{int(time.time())}.sh"
         await asyncssh.scp(str(PREPARE_SCRIPT), (conn, remote_prepare))
-        await _remote_run(conn, f"sudo bash {shlex.quote(remote_prepare)}")
-        await _remote_run(conn, f"sudo rm -f {shlex.quote(remote_prepare)}")
+        # Run and remove the script in one round-trip, keeping the script's exit status.
+        q = shlex.quote(remote_prepare)
+        await _remote_run(conn, f"sudo bash {q}; rc=$?; sudo rm -f {q}; exit $rc")
+        await _wait_registry_ready(conn, timeout=300)
 
 
 def _get_instance_ips(ec2, instance_ids: list[str], *, ip_field: str) -> dict[str, str]:
@@ -224,15 +222,13 @@ def _get_instance_ips(ec2, instance_ids: list[str], *, ip_field: str) -> dict[st
     return result
 
 
-async def _wait_registry_ready(host: str, *, ssh_user: str, ssh_key_path: str, timeout: int = 300) -> None:
-    conn = await _connect_with_retry(host, ssh_user=ssh_user, ssh_key_path=ssh_key_path, timeout=timeout)
-    async with conn:
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            r = await conn.run("curl -fsS http://localhost:5000/v2/ >/dev/null", check=False)
-            if r.exit_status == 0:
-                return
-            await asyncio.sleep(3)
+async def _wait_registry_ready(conn: asyncssh.SSHClientConnection, *, timeout: int = 300) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        r = await conn.run("curl -fsS http://localhost:5000/v2/ >/dev/null", check=False)
+        if r.exit_status == 0:
+            return
+        await asyncio.sleep(3)
     raise RuntimeError("registry not ready on builder within timeout")
 
 
@@ -337,7 +333,6 @@ def main() -> None:
         logger.success(f"builder ready: {builder_ip}")
 
         asyncio.run(_prepare_registry_builder(builder_ip, ssh_user=ssh_user, ssh_key_path=ssh_key_path))
-        asyncio.run(_wait_registry_ready(builder_ip, ssh_user=ssh_user, ssh_key_path=ssh_key_path, timeout=300))
 
         builder_private_ip = _get_instance_ips(raw_ec2, [builder_id], ip_field="PrivateIpAddress").get(builder_id)
         if not builder_private_ip:
@@ -2,13 +2,14 @@
 # Original file: launch-on-demand.sh
 
 import argparse
+import json
 import os
 
 from dotenv import load_dotenv
 
 import traceback
 from typing import List, Optional, Literal
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 import boto3
 import subprocess
 import time
@@ -18,8 +19,6 @@ from aws_instances.get_instance_ips import get_ec2_instance_ips
 from loguru import logger
 from utils.counter import AtomicCounter
 
-import pickle
-
 SSH_CONNECT_CHECK_POOL = ThreadPoolExecutor(max_workers=400)
 
 @dataclass
@@ -108,7 +107,7 @@ class Instances:
         return Instances(instance_ids=instance_ids, status="created", config=config)
     
 
-    def wait_for_all_running(self, check_interval = 3):
+    def wait_for_all_running(self, check_interval = 3, max_attempts = 200):
         ec2_client = boto3.client('ec2', region_name=self.config.aws_region)
 
         if self.status == "running":
@@ -116,25 +115,14 @@ class Instances:
         elif self.status != "created":
             raise Exception(f"Incorrect status {self.status} while waiting for instance launch")
         
-        while True:
-            response = ec2_client.describe_instances(
-                Filters=[
-                    {'Name': 'tag:role', 'Values': [config.role]},
-                    {'Name': 'instance-state-name', 'Values': ['running']}
-                ]
-            )
-            
-            running_count = sum(
-                len(reservation['Instances'])
-                for reservation in response['Reservations']
-            )
-            
-            logger.info(f"{running_count} 个实例正在运行...")
-            
-            if running_count >= config.instance_count:
-                break
-            
-            time.sleep(check_interval)
+        # 使用 boto3 waiter，只按本组实例 ID 批量查询状态，超过 max_attempts 抛出 WaiterError
+        logger.info(f"等待 {len(self.instance_ids)} 个实例进入 running 状态...")
+        ec2_client.get_waiter('instance_running').wait(
+            InstanceIds=self.instance_ids,
+            WaiterConfig={'Delay': check_interval, 'MaxAttempts': max_attempts},
+        )
+        self.status = "running"
+        logger.info(f"{len(self.instance_ids)} 个实例正在运行")
 
     
     def check_ssh_connection(
@@ -251,6 +239,17 @@ class Instances:
 
         logger.info(f"完成 {len(self.ip_addresses)} 个实例的脚本执行")
 
+    def dump(self, path: str):
+        """以 JSON 保存实例组，避免 pickle 反序列化执行任意代码"""
+        with open(path, 'w') as file:
+            json.dump(asdict(self), file, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'Instances':
+        with open(path) as file:
+            data = json.load(file)
+        return Instances(config=LaunchConfig(**data.pop("config")), **data)
+
     def terminate(self):
         """终止所有实例"""
         if self.status == "stopping":
@@ -280,8 +279,7 @@ def launch(config: LaunchConfig, dump_file: str):
         logger.info(f"实例 ID: {instances.instance_ids}")
         logger.info(f"IP 地址: {instances.ip_addresses}")
 
-        with open(dump_file, 'wb') as file: 
-            pickle.dump(instances, file)
+        instances.dump(dump_file)
     except Exception:
         traceback.print_exc() 
         logger.warning(f"遇到错误，销毁所有实例")
@@ -301,7 +299,7 @@ def arg_parser():
     
     # destroy subcommand
     destroy = subparsers.add_parser("destroy", help="Destroy instances", formatter_class=argparse.ArgumentDefaultsHelpFormatter)
-    destroy.add_argument("-f", "--dump-file", default="instances.pkl", help="Path to the instance file")
+    destroy.add_argument("-f", "--dump-file", default="aws_servers.json", help="Path to the instance file")
 
     return parser
 
@@ -329,6 +327,5 @@ if __name__ == "__main__":
         )
         launch(config, args.dump_file)
     elif args.command == "destroy":
-        with open(args.dump_file, "rb") as f:
-            instances: Instances = pickle.load(f)
+        instances = Instances.load(args.dump_file)
         instances.terminate()
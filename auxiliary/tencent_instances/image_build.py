@@ -11,8 +11,8 @@ from dotenv import load_dotenv
 from tencentcloud.cvm.v20170312 import models as cvm_models
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
 
+from utils.ssh_connect import connect_ssh
 from utils.wait_until import wait_until
-from cloud_provisioner.create_instances.instance_verifier import _check_port
 from cloud_provisioner.tencent_provider.client_factory import TencentClient
 from cloud_provisioner.tencent_provider.instance import delete_instances
 
@@ -241,9 +241,9 @@ def start_builder_instance(client: TencentClient, cfg: CvmRuntimeConfig, zone_id
 
 
 async def prepare_docker_server_image(host: str, cfg: CvmRuntimeConfig) -> None:
-    wait_until_ssh_ready(host, timeout=cfg.wait_timeout)
     key_path = str(Path(cfg.ssh_private_key_path).expanduser())
-    async with asyncssh.connect(host, username=cfg.ssh_username, client_keys=[key_path], known_hosts=None) as conn:
+    conn = await connect_ssh(host, cfg.ssh_username, key_path, timeout=cfg.wait_timeout)
+    async with conn:
         async def run(cmd: str, check: bool = True) -> None:
             logger.info(f"remote: {cmd}")
             r = await conn.run(cmd, check=False)
@@ -258,12 +258,9 @@ async def prepare_docker_server_image(host: str, cfg: CvmRuntimeConfig) -> None:
             raise FileNotFoundError(f"prepare script not found: {PREPARE_SCRIPT}")
         remote_prepare = f"/tmp/{PREPARE_SCRIPT.name}.{int(time.time())}.sh"
         await asyncssh.scp(str(PREPARE_SCRIPT), (conn, remote_prepare))
-        await run(f"sudo bash {shlex.quote(remote_prepare)}")
-        await run(f"sudo rm -f {shlex.quote(remote_prepare)}")
-
-
-def wait_until_ssh_ready(host: str, timeout: int = 1800) -> None:
-    wait_until(lambda: _check_port(host), timeout=timeout, retry_interval=3)
+        # Run and remove the script in one round-trip, keeping the script's exit status.
+        q = shlex.quote(remote_prepare)
+        await run(f"sudo bash {q}; rc=$?; sudo rm -f {q}; exit $rc")
 
 
 def create_server_image(
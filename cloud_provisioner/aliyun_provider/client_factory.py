@@ -1,6 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import os
-from typing import List, Optional, Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 from alibabacloud_ecs20140526.client import Client as EcsClient
 from alibabacloud_tea_openapi.models import Config as AliyunConfig
 
@@ -22,6 +23,8 @@ from ..create_instances.types import CreateInstanceError, ImageInfo, InstanceSta
 class AliyunClient(IEcsClient):
     access_key_id: str
     access_key_secret: str
+    _clients: Dict[str, EcsClient] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _clients_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     @classmethod
     def load_from_env(cls) -> 'AliyunClient':
@@ -30,15 +33,21 @@ class AliyunClient(IEcsClient):
         return AliyunClient(access_key_id=access_key_id, access_key_secret=access_key_secret)
 
     def build(self, region_id: str) -> EcsClient:
-        return EcsClient(
-            AliyunConfig(
-                access_key_id=self.access_key_id,
-                access_key_secret=self.access_key_secret,
-                region_id=region_id,
-                read_timeout=120_000,
-                connect_timeout=120_000
-            )
-        )
+        # Reuse one SDK client per region instead of re-resolving its endpoint on every call.
+        with self._clients_lock:
+            client = self._clients.get(region_id)
+            if client is None:
+                client = EcsClient(
+                    AliyunConfig(
+                        access_key_id=self.access_key_id,
+                        access_key_secret=self.access_key_secret,
+                        region_id=region_id,
+                        read_timeout=120_000,
+                        connect_timeout=120_000
+                    )
+                )
+                self._clients[region_id] = client
+            return client
         
     def get_zone_ids_in_region(self, region_id: str) -> List[str]:
         client = self.build(region_id)
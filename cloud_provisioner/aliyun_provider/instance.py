@@ -1,18 +1,23 @@
 # pyright: reportOptionalOperand=false
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 import time
 import traceback
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
-from alibabacloud_ecs20140526.models import DescribeInstancesRequest, RunInstancesRequestTag, RunInstancesRequestSystemDisk, RunInstancesRequest, DescribeInstancesResponseBodyInstancesInstance, DeleteInstancesRequest
+from alibabacloud_ecs20140526.models import DescribeInstancesRequest, RunInstancesRequestTag, RunInstancesRequestSystemDisk, RunInstancesRequest, DescribeInstancesResponseBodyInstancesInstance, DeleteInstancesRequest, DescribeInstancesRequestTag
 from loguru import logger
 
 from cloud_provisioner.cleanup_instances.types import InstanceInfoWithTag
+from utils.wait_until import backoff_delay
 
 from ..create_instances.types import InstanceStatus, RegionInfo, ZoneInfo, InstanceType, CreateInstanceError
 from ..create_instances.instance_config import InstanceConfig, DEFAULT_COMMON_TAG_KEY, DEFAULT_COMMON_TAG_VALUE
 from alibabacloud_ecs20140526.client import Client
+
+# 鉴权类错误重试不会恢复，遇到后直接放弃该批次
+_FATAL_ERROR_PREFIXES = ("InvalidAccessKeyId", "Forbidden", "SignatureDoesNotMatch")
     
 
 def _instance_tags(cfg: InstanceConfig) -> List[RunInstancesRequestTag]:
@@ -40,7 +45,7 @@ def create_instances_in_zone(
     min_amount: int,
 ) -> Tuple[list[str], CreateInstanceError]:    
     disk = RunInstancesRequestSystemDisk(category="cloud_essd", size=str(cfg.disk_size))
-    name = f"{cfg.instance_name_prefix}-{int(time.time())}"
+    name = f"{cfg.instance_name_prefix}-{cfg.launch_timestamp}"
         
     req = RunInstancesRequest(
         region_id=region_info.id,
@@ -96,17 +101,18 @@ def describe_instance_status(client: Client, region_id: str, instance_ids: List[
             region_id=region_id, page_size=100, instance_ids=json.dumps(query_chunk)))
         instance_status = rep.body.instances.instance
 
+        # 单次遍历同时归类 running 和 pending
         for instance in instance_status:
-            if instance.status not in ["Running"]:
-                continue
-            public_ip = instance.public_ip_address.ip_address[0]
-            private_ip = instance.vpc_attributes.private_ip_address.ip_address[0] or instance.inner_ip_address.ip_address[0]
-            running_instances[instance.instance_id] = (public_ip, private_ip)
-        
-        # 阿里云启动阶段也可能读到 instance 是 stopped 的状态
-        pending_instances.update({i.instance_id for i in instance_status if i.status in [
-                                 "Starting", "Pending", "Stopped"]})
-        time.sleep(0.5)
+            if instance.status == "Running":
+                public_ip = instance.public_ip_address.ip_address[0]
+                private_ip = instance.vpc_attributes.private_ip_address.ip_address[0] or instance.inner_ip_address.ip_address[0]
+                running_instances[instance.instance_id] = (public_ip, private_ip)
+            # 阿里云启动阶段也可能读到 instance 是 stopped 的状态
+            elif instance.status in {"Starting", "Pending", "Stopped"}:
+                pending_instances.add(instance.instance_id)
+        # 只在批次之间限速，最后一批查询完直接返回
+        if i + 100 < len(instance_ids):
+            time.sleep(0.5)
     return InstanceStatus(running_instances=running_instances, pending_instances=pending_instances)
 
 
@@ -114,8 +120,11 @@ def get_instances_with_tag(client: Client, region_id: str) -> List[InstanceInfoW
     instances = []
     page_number = 1
     
+    # 公共 tag 交给服务端过滤，不再拉取整个 region 的实例
+    common_tag = [DescribeInstancesRequestTag(key=DEFAULT_COMMON_TAG_KEY, value=DEFAULT_COMMON_TAG_VALUE)]
+    
     while True:
-        rep = client.describe_instances(DescribeInstancesRequest(region_id=region_id, page_number=page_number, page_size=50))
+        rep = client.describe_instances(DescribeInstancesRequest(region_id=region_id, page_number=page_number, page_size=50, tag=common_tag))
         instances.extend([as_instance_info_with_tag(instance) for instance in rep.body.instances.instance])
         
         if rep.body.total_count <= page_number * 50:
@@ -124,15 +133,30 @@ def get_instances_with_tag(client: Client, region_id: str) -> List[InstanceInfoW
         
     return instances
 
+def delete_instance_chunk(client: Client, region_id: str, chunks: List[str], *, max_attempts: Optional[int] = None) -> bool:
+    """删除一批实例（最多 100 个），失败时退避重试；max_attempts 为 None 时一直重试直到成功或遇到鉴权错误"""
+    attempt = 0
+    while True: 
+        try: 
+            client.delete_instances(DeleteInstancesRequest(region_id = region_id, force_stop=True, force=True, instance_id=chunks))
+            return True
+        except Exception as e:
+            code = getattr(e, "code", None)
+            if code == "IncorrectInstanceStatus.Initializing":
+                logger.warning(f"Some instances in region {region_id} is still initializing, waiting_retry")
+            elif isinstance(code, str) and code.startswith(_FATAL_ERROR_PREFIXES):
+                logger.error(f"Cannot delete instances in region {region_id}, give up: {e}")
+                return False
+            else:
+                logger.warning(f"Cannot delete instances in region {region_id}: {e}")
+        attempt += 1
+        if max_attempts is not None and attempt >= max_attempts:
+            return False
+        time.sleep(backoff_delay(attempt - 1))
+
+
 def delete_instances(client: Client, region_id: str, instances_ids: List[str]):
-    for i in range(0, len(instances_ids), 100):
-        chunks = instances_ids[i:i+100]
-        while True: 
-            try: 
-                client.delete_instances(DeleteInstancesRequest(region_id = region_id, force_stop=True, force=True, instance_id=chunks))
-                break
-            except Exception as e:
-                code = getattr(e, "code", None)
-                if code == "IncorrectInstanceStatus.Initializing":
-                    logger.warning(f"Some instances in region {region_id} is still initializing, waiting_retry")
-            time.sleep(5)
\ No newline at end of file
+    chunk_list = [instances_ids[i:i + 100] for i in range(0, len(instances_ids), 100)]
+    # 各批次互不依赖，并行提交
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(chunk_list)))) as executor:
+        list(executor.map(lambda chunks: delete_instance_chunk(client, region_id, chunks), chunk_list))
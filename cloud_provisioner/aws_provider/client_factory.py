@@ -1,7 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import os
-from typing import List, Optional, Tuple
+import threading
+from typing import Dict, List, Optional, Tuple
 import boto3
+from botocore.config import Config as BotoConfig
 
 from cloud_provisioner.cleanup_instances.types import InstanceInfoWithTag
 
@@ -19,16 +21,28 @@ from ..create_instances.types import CreateInstanceError, ImageInfo, InstanceSta
 
 from mypy_boto3_ec2.client import EC2Client
 
+# The default pool of 10 connections caps concurrent requests from the per-region worker threads;
+# adaptive retries also rate-limit the client on throttling instead of failing fast.
+_BOTO_CONFIG = BotoConfig(max_pool_connections=64, retries={'mode': 'adaptive', 'max_attempts': 10})
+
 @dataclass
 class AwsClient(IEcsClient):
-    pass
+    _clients: Dict[str, EC2Client] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _clients_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     @classmethod
     def new(cls) -> 'AwsClient':
         return AwsClient()
 
     def build(self, region_id: str) -> EC2Client:
-        return boto3.client('ec2', region_name=region_id)
+        # One client per region keeps botocore's connection pool (DNS, TCP, TLS) warm across calls.
+        # Creating clients from the default session is not thread-safe, hence the lock.
+        with self._clients_lock:
+            client = self._clients.get(region_id)
+            if client is None:
+                client = boto3.client('ec2', region_name=region_id, config=_BOTO_CONFIG)
+                self._clients[region_id] = client
+            return client
         
     def get_zone_ids_in_region(self, region_id: str) -> List[str]:
         client = self.build(region_id)
@@ -1,5 +1,6 @@
 # pyright: reportTypedDictNotRequiredAccess=false
 
+from concurrent.futures import ThreadPoolExecutor
 import time
 import traceback
 from typing import List, Tuple
@@ -8,6 +9,7 @@ from botocore.exceptions import ClientError
 from loguru import logger
 
 from cloud_provisioner.cleanup_instances.types import InstanceInfoWithTag
+from utils.wait_until import backoff_delay
 
 from ..create_instances.types import CreateInstanceError, InstanceStatus, RegionInfo, ZoneInfo, InstanceType
 from ..create_instances.instance_config import InstanceConfig, DEFAULT_COMMON_TAG_KEY, DEFAULT_COMMON_TAG_VALUE
@@ -15,6 +17,9 @@ from .zone_unavailable import is_zone_unavailable_error
 
 from mypy_boto3_ec2.client import EC2Client
 
+# 鉴权类错误重试不会恢复，遇到后直接放弃该批次
+_FATAL_ERROR_CODES = {"AuthFailure", "UnauthorizedOperation", "OptInRequired"}
+
 
 def _instance_tags(cfg: InstanceConfig) -> List[dict]:
     return [
@@ -45,7 +50,7 @@ def create_instances_in_zone(
     max_amount: int,
     min_amount: int,
 ) -> Tuple[list[str], CreateInstanceError]:   
-    name = f"{cfg.instance_name_prefix}-{int(time.time())}"
+    name = f"{cfg.instance_name_prefix}-{cfg.launch_timestamp}"
     
     tags = _instance_tags(cfg) + [{'Key': 'Name', 'Value': name}]
     instance_market_options = None
@@ -137,7 +142,9 @@ def describe_instance_status(client: EC2Client, instance_ids: List[str]):
                 elif status in ['pending', 'stopped']:
                     pending_instances.add(instance_id)
         
-        time.sleep(0.5)
+        # 只在批次之间限速，最后一批查询完直接返回
+        if i + 1000 < len(instance_ids):
+            time.sleep(0.5)
     
     return InstanceStatus(running_instances=running_instances, pending_instances=pending_instances)
 
@@ -145,19 +152,22 @@ def get_instances_with_tag(client: EC2Client) -> List[InstanceInfoWithTag]:
     instances = []
     next_token = None
     
+    # 公共 tag 和实例状态在同一次请求中交给服务端过滤
+    # AWS API 会返回已经销毁的实例，状态为 terminated，应该被忽略
+    filters = [
+        {'Name': f'tag:{DEFAULT_COMMON_TAG_KEY}', 'Values': [DEFAULT_COMMON_TAG_VALUE]},
+        {'Name': 'instance-state-name', 'Values': ['pending', 'running', 'shutting-down', 'stopping', 'stopped']},
+    ]
+    
     while True:
-        params = {}
+        params = {'Filters': filters}
         if next_token:
             params['NextToken'] = next_token
         
-        response = client.describe_instances(**params)
+        response = client.describe_instances(**params)  # pyright: ignore[reportArgumentType]
         
         for reservation in response['Reservations']:
             for instance in reservation['Instances']:
-                # AWS API 会返回已经销毁的实例，状态为 terminated，应该被忽略
-                if instance['State']['Name'] == 'terminated':
-                    continue
-                
                 instances.append(as_instance_info_with_tag(instance))
         
         next_token = response.get('NextToken')
@@ -167,18 +177,27 @@ def get_instances_with_tag(client: EC2Client) -> List[InstanceInfoWithTag]:
     return instances
 
 
+def _delete_chunk(client, chunks: List[str]):
+    attempt = 0
+    while True:
+        try:
+            client.terminate_instances(InstanceIds=chunks)
+            break
+        except Exception as e:
+            logger.error(f"Cannot delete: {e.__dict__}")
+            if isinstance(e, ClientError) and e.response['Error']['Code'] in _FATAL_ERROR_CODES:
+                return
+            # 下面的逻辑移植自阿里云，但 aws 好像没有这个问题：禁止删除 initialize 阶段的 instance
+            # response = getattr(e, 'response', {})
+            # error_code = response.get('Error', {}).get('Code')
+            # if error_code == 'IncorrectInstanceState':
+            #     logger.warning(f"Some instances in region {region_id} is still initializing, waiting_retry")
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
+
+
 def delete_instances(client, instances_ids: List[str]):
-    for i in range(0, len(instances_ids), 1000):
-        chunks = instances_ids[i:i+1000]
-        while True:
-            try:
-                client.terminate_instances(InstanceIds=chunks)
-                break
-            except Exception as e:
-                logger.error(f"Cannot delete: {e.__dict__}")
-                # 下面的逻辑移植自阿里云，但 aws 好像没有这个问题：禁止删除 initialize 阶段的 instance
-                # response = getattr(e, 'response', {})
-                # error_code = response.get('Error', {}).get('Code')
-                # if error_code == 'IncorrectInstanceState':
-                #     logger.warning(f"Some instances in region {region_id} is still initializing, waiting_retry")
-            time.sleep(5)
\ No newline at end of file
+    chunk_list = [instances_ids[i:i + 1000] for i in range(0, len(instances_ids), 1000)]
+    # 各批次互不依赖，并行提交
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(chunk_list)))) as executor:
+        list(executor.map(lambda chunks: _delete_chunk(client, chunks), chunk_list))
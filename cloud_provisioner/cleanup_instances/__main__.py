@@ -56,7 +56,8 @@ def _delete_in_region(client: IEcsClient, region_id: str, predicate: Callable[[I
 
 
 def delete_instances(client: IEcsClient, regions: List[str], predicate: Callable[[InstanceInfoWithTag], bool]):
-    with ThreadPoolExecutor(max_workers=5) as executor:
+    # One worker per region: regions are independent endpoints, so cleanup time is bounded by the slowest one.
+    with ThreadPoolExecutor(max_workers=max(1, len(regions))) as executor:
         _ = list(executor.map(lambda region: _delete_in_region(client, region, predicate), regions))
 
 
@@ -12,9 +12,6 @@ import os
 from dotenv import load_dotenv
 from loguru import logger
 
-from ..aliyun_provider.client_factory import AliyunClient
-from ..aws_provider.client_factory import AwsClient
-from ..tencent_provider.client_factory import TencentClient
 from ..host_spec import save_hosts
 from ..provider_interface import IEcsClient
 
@@ -213,7 +210,9 @@ if __name__ == "__main__":
 
     cloud_tasks = []
     
+    # Provider SDKs are slow to import, so only load the ones this run needs.
     if config.aws.total_nodes > 0:
+        from ..aws_provider.client_factory import AwsClient
         aws_client = AwsClient.new()
         cloud_tasks.append((aws_client, config.aws))
         if not config.aws.user_tag.startswith(user_tag_prefix):
@@ -221,6 +220,7 @@ if __name__ == "__main__":
             sys.exit(1)
      
     if config.aliyun.total_nodes > 0:
+        from ..aliyun_provider.client_factory import AliyunClient
         ali_client = AliyunClient.load_from_env()
         cloud_tasks.append((ali_client, config.aliyun))
         if not config.aliyun.user_tag.startswith(user_tag_prefix):
@@ -232,6 +232,7 @@ if __name__ == "__main__":
         logger.success(f"计划启动 {total_nodes} 个节点，aws {config.aws.total_nodes}, aliyun {config.aliyun.total_nodes}, tencent {config.tencent.total_nodes}")
         
     if config.tencent.total_nodes > 0:
+        from ..tencent_provider.client_factory import TencentClient
         tencent_client = TencentClient.load_from_env()
         cloud_tasks.append((tencent_client, config.tencent))
         
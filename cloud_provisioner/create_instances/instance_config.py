@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import time
 
 
 DEFAULT_COMMON_TAG_KEY = "conflux-massive-test"
@@ -11,6 +12,8 @@ class InstanceConfig:
     user_tag_key: str = DEFAULT_USER_TAG_KEY
     
     instance_name_prefix: str = "conflux-massive-test"
+    # Taken once per run so every instance of a launch shares the same name suffix
+    launch_timestamp: int = field(default_factory=lambda: int(time.time()))
     
     disk_size: int = 40
     internet_max_bandwidth_out: int = 100
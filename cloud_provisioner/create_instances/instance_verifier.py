@@ -23,6 +23,8 @@ class InstanceVerifier:
     request_nodes: int
     ready_instances: List[Tuple[Instance, str, str]]
     pending_instances: Dict[str, Instance]
+    _ready_nodes: int
+    _pending_nodes: int
 
     _event: threading.Event
     _stop: threading.Event
@@ -35,6 +37,8 @@ class InstanceVerifier:
         self.request_nodes = target_nodes + additional_nodes
         self.ready_instances = []
         self.pending_instances = dict()
+        self._ready_nodes = 0
+        self._pending_nodes = 0
         
         self._stop = threading.Event()
         self._event = threading.Event()
@@ -48,13 +52,24 @@ class InstanceVerifier:
         return not self._stop.is_set()
 
     def submit_pending_instances(self, ids: List[str], type: InstanceType, zone_id: str):
-        self.pending_instances.update(
-            {id: Instance(instance_id=id, type=type, zone_id=zone_id) for id in ids})
+        with self._lock:
+            for id in ids:
+                if id in self.pending_instances:
+                    self._pop_pending_instance(id)
+                self.pending_instances[id] = Instance(instance_id=id, type=type, zone_id=zone_id)
+                self._pending_nodes += type.nodes
+
+    def _pop_pending_instance(self, instance_id: str) -> Instance:
+        # 调用方需持有 self._lock
+        instance = self.pending_instances.pop(instance_id)
+        self._pending_nodes -= instance.type.nodes
+        return instance
 
     @property
     def ready_nodes(self):
+        # 轮询循环每轮都会检查，维护累计值而不是每次重新求和
         with self._lock:
-            return sum([instance.type.nodes for instance, _, _ in self.ready_instances])
+            return self._ready_nodes
 
     def copy_ready_instances(self):
         with self._lock:
@@ -62,8 +77,9 @@ class InstanceVerifier:
 
     @property
     def pending_nodes(self):
+        # 与 ready_nodes 相同，维护累计值，避免每次遍历所有 pending instance
         with self._lock:
-            return sum([instance.type.nodes for instance in self.pending_instances.values()])
+            return self._pending_nodes
 
     def get_rest_nodes(self, *, wait_for_pendings=False):
         while True:
@@ -116,7 +132,7 @@ class InstanceVerifier:
                     logger.info(
                         f"Instances {lost_instances} lost or stopped in region {self.region_id}")
                     for instance_id in lost_instances:
-                        del self.pending_instances[instance_id]
+                        self._pop_pending_instance(instance_id)
                     self._event.set()
 
                 if self.ready_nodes >= self.target_nodes:
@@ -158,14 +174,14 @@ class InstanceVerifier:
                         f"Region {self.region_id} Instance {instance_id} IP {public_ip} connect success ({get_global_counter("ssh_check").increment()})")
 
                     with self._lock:
-                        instance = self.pending_instances[instance_id]
-                        del self.pending_instances[instance_id]
+                        instance = self._pop_pending_instance(instance_id)
                         self.ready_instances.append((instance, public_ip, private_ip))
+                        self._ready_nodes += instance.type.nodes
                 else:
                     logger.info(
                         f"Region {self.region_id} Instance {instance_id} IP {public_ip} connect fail (timeout)")
                     with self._lock:
-                        del self.pending_instances[instance_id]
+                        self._pop_pending_instance(instance_id)
 
             for instance_id in to_clear_instance_ids:
                 del future_set[instance_id]
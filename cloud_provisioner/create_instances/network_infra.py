@@ -49,7 +49,8 @@ class InfraRequest:
                             )
 
     def ensure_infras(self, client: IEcsClient) -> InfraProvider:
-        with ThreadPoolExecutor(max_workers=5) as executor:
+        # 各 region 互不依赖，与 run_regions_with_config 一致，每个 region 一个线程
+        with ThreadPoolExecutor(max_workers=min(20, max(1, len(self.region_ids)))) as executor:
             regions = list(executor.map(lambda region_id: self._ensure_region(
                 client, region_id), self.region_ids))
 
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Dict, Set, Tuple
 from enum import Enum
 
@@ -56,11 +57,15 @@ class InstanceStatus:
 class KeyPairRequestConfig:
     key_path: str
     key_pair_name: str
+    # 每个 region 都会比对指纹，按 provider 缓存，避免重复读取和解析私钥
+    _finger_prints: Dict[str, str] = field(default_factory=dict, init=False, repr=False, compare=False)
     
     def finger_print(self, provider: str):
-        return get_fingerprint_from_key(self.key_path, provider)
+        if provider not in self._finger_prints:
+            self._finger_prints[provider] = get_fingerprint_from_key(self.key_path, provider)
+        return self._finger_prints[provider]
         
-    @property
+    @cached_property
     def public_key(self):
         return get_public_key_body(self.key_path)
 
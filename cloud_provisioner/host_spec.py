@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass
 import json
+import os
 from typing import List, Optional
 
 
@@ -20,8 +21,13 @@ class HostSpec:
 
     
 def save_hosts(hosts: List[HostSpec], file_path: str):
-    json.dump([asdict(host) for host in hosts], open(file_path, "w"), ensure_ascii=True, indent=2)
+    # Write to a sibling temp file and rename, so an interrupted run never leaves a truncated inventory.
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump([asdict(host) for host in hosts], f, ensure_ascii=True, indent=2)
+    os.replace(tmp_path, file_path)
     
 def load_hosts(file_path: str) -> List[HostSpec]:
-    data = json.load(open(file_path, "r"))
+    with open(file_path, "r") as f:
+        data = json.load(f)
     return [HostSpec(**item) for item in data]
\ No newline at end of file
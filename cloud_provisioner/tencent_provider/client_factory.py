@@ -1,6 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import os
-from typing import List, Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 from tencentcloud.common import credential
 from tencentcloud.common.profile.client_profile import ClientProfile
@@ -30,6 +31,8 @@ def _build_profile(endpoint: str) -> ClientProfile:
 class TencentClient(IEcsClient):
     secret_id: str
     secret_key: str
+    _clients: Dict[Tuple[str, str], Any] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _clients_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
 
     @classmethod
     def load_from_env(cls) -> "TencentClient":
@@ -40,11 +43,26 @@ class TencentClient(IEcsClient):
     def _credential(self) -> credential.Credential:
         return credential.Credential(self.secret_id, self.secret_key)
 
+    def _cached(self, service: str, region_id: str, factory):
+        # One client per (service, region) keeps its HTTP session, and the connections in it, alive.
+        with self._clients_lock:
+            client = self._clients.get((service, region_id))
+            if client is None:
+                client = factory()
+                self._clients[(service, region_id)] = client
+            return client
+
     def build_cvm(self, region_id: str) -> cvm_client.CvmClient:
-        return cvm_client.CvmClient(self._credential(), region_id, _build_profile("cvm.tencentcloudapi.com"))
+        return self._cached(
+            "cvm", region_id,
+            lambda: cvm_client.CvmClient(self._credential(), region_id, _build_profile("cvm.tencentcloudapi.com")),
+        )
 
     def build_vpc(self, region_id: str) -> vpc_client.VpcClient:
-        return vpc_client.VpcClient(self._credential(), region_id, _build_profile("vpc.tencentcloudapi.com"))
+        return self._cached(
+            "vpc", region_id,
+            lambda: vpc_client.VpcClient(self._credential(), region_id, _build_profile("vpc.tencentcloudapi.com")),
+        )
 
     def get_zone_ids_in_region(self, region_id: str) -> List[str]:
         client = self.build_cvm(region_id)
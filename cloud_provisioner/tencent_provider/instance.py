@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 import time
 import traceback
 from typing import List
@@ -9,9 +10,13 @@ from tencentcloud.cvm.v20170312.cvm_client import CvmClient
 from tencentcloud.common.exception.tencent_cloud_sdk_exception import TencentCloudSDKException
 
 from cloud_provisioner.cleanup_instances.types import InstanceInfoWithTag
+from utils.wait_until import backoff_delay
 from ..create_instances.types import InstanceStatus, RegionInfo, ZoneInfo, InstanceType, CreateInstanceError
 from ..create_instances.instance_config import InstanceConfig, DEFAULT_COMMON_TAG_KEY, DEFAULT_COMMON_TAG_VALUE
 
+# 鉴权类错误重试不会恢复，遇到后直接放弃该批次
+_FATAL_ERROR_PREFIXES = ("AuthFailure", "UnauthorizedOperation")
+
 
 def _instance_tags(cfg: InstanceConfig) -> List[cvm_models.Tag]:
     common_tag = cvm_models.Tag()
@@ -57,7 +62,7 @@ def create_instances_in_zone(
     max_amount: int,
     min_amount: int,
 ) -> tuple[list[str], CreateInstanceError]:
-    name = f"{cfg.instance_name_prefix}-{int(time.time())}"
+    name = f"{cfg.instance_name_prefix}-{cfg.launch_timestamp}"
 
     placement = cvm_models.Placement()
     placement.Zone = zone_info.id
@@ -152,7 +157,9 @@ def describe_instance_status(client: CvmClient, instance_ids: List[str]) -> Inst
                 running_instances[ins.InstanceId] = (public_ip, private_ip)
             elif state in {"PENDING", "STARTING", "STOPPING", "STOPPED", "REBOOTING", "LAUNCH_FAILED"}:
                 pending_instances.add(ins.InstanceId)
-        time.sleep(0.5)
+        # 只在批次之间限速，最后一批查询完直接返回
+        if i + 100 < len(instance_ids):
+            time.sleep(0.5)
 
     return InstanceStatus(running_instances=running_instances, pending_instances=pending_instances)
 
@@ -162,10 +169,16 @@ def get_instances_with_tag(client: CvmClient) -> List[InstanceInfoWithTag]:
     offset = 0
     limit = 100
 
+    # 公共 tag 交给服务端过滤，不再拉取整个 region 的实例
+    common_tag = cvm_models.Filter()
+    common_tag.Name = f"tag:{DEFAULT_COMMON_TAG_KEY}"
+    common_tag.Values = [DEFAULT_COMMON_TAG_VALUE]
+
     while True:
         req = cvm_models.DescribeInstancesRequest()
         req.Offset = offset
         req.Limit = limit
+        req.Filters = [common_tag]
 
         rep = client.DescribeInstances(req)
         if rep.InstanceSet:
@@ -178,20 +191,28 @@ def get_instances_with_tag(client: CvmClient) -> List[InstanceInfoWithTag]:
     return instances
 
 
+def _delete_chunk(client: CvmClient, chunks: List[str]):
+    # logger.info(f"Deleting chunk: {chunks}")
+    attempt = 0
+    while True:
+        try:
+            req = cvm_models.TerminateInstancesRequest()
+            req.InstanceIds = chunks
+            client.TerminateInstances(req)
+            logger.success(f"Successfully deleted instances: {chunks}")
+            break
+        except TencentCloudSDKException as e:
+            logger.error(f"Cannot delete: {e}")
+            if (e.code or "").startswith(_FATAL_ERROR_PREFIXES):
+                return
+        except Exception as e:
+            logger.error(f"Cannot delete: {e}")
+        time.sleep(backoff_delay(attempt))
+        attempt += 1
+
+
 def delete_instances(client: CvmClient, instances_ids: List[str]):
-    # logger.info(f"Deleting {len(instances_ids)} instances: {instances_ids}")
-    for i in range(0, len(instances_ids), 100):
-        chunks = instances_ids[i:i + 100]
-        # logger.info(f"Deleting chunk: {chunks}")
-        while True:
-            try:
-                req = cvm_models.TerminateInstancesRequest()
-                req.InstanceIds = chunks
-                client.TerminateInstances(req)
-                logger.success(f"Successfully deleted instances: {chunks}")
-                break
-            except TencentCloudSDKException as e:
-                logger.error(f"Cannot delete: {e}")
-            except Exception as e:
-                logger.error(f"Cannot delete: {e}")
-            # time.sleep(5)
+    chunk_list = [instances_ids[i:i + 100] for i in range(0, len(instances_ids), 100)]
+    # 各批次互不依赖，并行提交
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(chunk_list)))) as executor:
+        list(executor.map(lambda chunks: _delete_chunk(client, chunks), chunk_list))
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from tencentcloud.vpc.v20170312 import models as vpc_models
@@ -13,25 +14,28 @@ def as_vpc_info(rep: vpc_models.Vpc) -> VpcInfo:
     return VpcInfo(vpc_id=rep.VpcId, vpc_name=rep.VpcName)
 
 
+def _describe_vpcs_page(client: VpcClient, offset: int, limit: int) -> vpc_models.DescribeVpcsResponse:
+    req = vpc_models.DescribeVpcsRequest()
+    req.Offset = str(offset)
+    req.Limit = str(limit)
+    return client.DescribeVpcs(req)
+
+
 def get_vpcs_in_region(client: VpcClient) -> List[VpcInfo]:
-    result: List[VpcInfo] = []
-    offset = 0
     limit = 100
 
-    while True:
-        req = vpc_models.DescribeVpcsRequest()
-        req.Offset = str(offset)
-        req.Limit = str(limit)
-
-        resp = client.DescribeVpcs(req)
-        if resp.VpcSet:
-            result.extend([as_vpc_info(vpc) for vpc in resp.VpcSet])
+    # The first page tells us TotalCount, so the remaining pages can be fetched concurrently.
+    first = _describe_vpcs_page(client, 0, limit)
+    pages = [first.VpcSet or []]
 
-        if resp.TotalCount is None or resp.TotalCount <= offset + limit:
-            break
-        offset += limit
+    total = first.TotalCount or 0
+    offsets = list(range(limit, total, limit))
+    if offsets:
+        with ThreadPoolExecutor(max_workers=min(8, len(offsets))) as executor:
+            responses = executor.map(lambda offset: _describe_vpcs_page(client, offset, limit), offsets)
+            pages.extend(resp.VpcSet or [] for resp in responses)
 
-    return result
+    return [as_vpc_info(vpc) for page in pages for vpc in page]
 
 
 def create_vpc(client: VpcClient, vpc_name: str, cidr_block: str):
@@ -24,7 +24,7 @@ from remote_simulation.network_topology import NetworkTopology
 from remote_simulation.port_allocation import remote_rpc_port
 from remote_simulation.image_prepare import prepare_images_by_zone
 from remote_simulation.remote_node import RemoteNode
-from remote_simulation.tools import init_tx_gen, wait_for_nodes_synced
+from remote_simulation.tools import collect_logs_v2, init_tx_gen, wait_for_nodes_synced
 from utils.counter import AtomicCounter
 from utils.wait_until import WaitUntilTimeoutError
 from utils import shell_cmds
@@ -56,13 +56,7 @@ def _test_say_hello(
     return False
 
 
-def _launch_node(host: HostSpec, index: int) -> RemoteNode | None:
-    try:
-        shell_cmds.ssh(host.ip, host.ssh_user, docker_cmds.launch_node(index))
-    except Exception as exc:
-        logger.info(f"{host.region} 实例 {host.ip} 节点 {index} 启动失败：{exc}")
-        return None
-
+def _wait_node_ready(host: HostSpec, index: int) -> RemoteNode | None:
     if not _test_say_hello(remote_rpc_port(index), host.ip):
         logger.info(f"{host.region} 实例 {host.ip} 节点 {index} 无法建立连接")
         return None
@@ -81,16 +75,26 @@ def _execute_instance(host: HostSpec, nodes_per_host: int, config_file, pull_doc
     try:
         shell_cmds.scp(config_file.path, host.ip, host.ssh_user, "~/config.toml")
         logger.debug(f"实例 {host.ip} 同步配置完成")
-        if pull_docker_image:
-            shell_cmds.ssh(host.ip, host.ssh_user, docker_cmds.pull_image())
-            logger.debug(f"实例 {host.ip} 拉取 docker 镜像完成")
-        shell_cmds.ssh(host.ip, host.ssh_user, docker_cmds.destory_all_nodes())
-        logger.debug(f"实例 {host.ip} 状态初始化完成，开始启动节点")
     except Exception as exc:
-        logger.warning(f"{host.region} 无法初始化实例 {host.ip}: {exc}")
+        logger.warning(f"{host.region} 无法同步配置到实例 {host.ip}: {exc}")
+        return []
+
+    # 拉取镜像、清理残留节点、启动全部节点合并为一次 SSH 执行，再并行等待各节点就绪
+    # 初始化失败时不会启动节点，命令整体返回非零
+    remote_cmds = [docker_cmds.pull_image()] if pull_docker_image else []
+    remote_cmds.append(docker_cmds.destory_all_nodes())
+    remote_cmds.append(docker_cmds.launch_nodes(range(nodes_per_host)))
+    try:
+        result = shell_cmds.ssh(host.ip, host.ssh_user, " && ".join(f"{{ {cmd}; }}" for cmd in remote_cmds))
+        failed = docker_cmds.parse_failed_launches(result.stdout)
+    except Exception as exc:
+        logger.warning(f"{host.region} 实例 {host.ip} 初始化或节点启动失败：{exc}")
         return []
+    for idx in sorted(failed):
+        logger.info(f"{host.region} 实例 {host.ip} 节点 {idx} 启动失败")
 
-    launch_future = NODE_CONNECT_POOL.map(lambda idx: _launch_node(host, idx), range(nodes_per_host))
+    launched = [idx for idx in range(nodes_per_host) if idx not in failed]
+    launch_future = NODE_CONNECT_POOL.map(lambda idx: _wait_node_ready(host, idx), launched)
     return [n for n in launch_future if n is not None]
 
 
@@ -107,60 +111,6 @@ def launch_remote_nodes(hosts: List[HostSpec], config_file, pull_docker_image: b
     return nodes
 
 
-def collect_logs(nodes: List[RemoteNode], local_path: str) -> None:
-    total_cnt = len(nodes)
-    counter1 = AtomicCounter()
-    counter2 = AtomicCounter()
-    script_local = Path(__file__).resolve().parent / "scripts" / "remote" / "collect_logs_root.sh"
-    if not script_local.exists():
-        raise FileNotFoundError(f"missing {script_local}")
-
-    Path(local_path).mkdir(parents=True, exist_ok=True)
-
-    def _archive_base(host: HostSpec) -> str:
-        return "/root" if host.ssh_user == "root" else f"/home/{host.ssh_user}"
-
-    def _generate(node: RemoteNode) -> tuple[RemoteNode, bool]:
-        try:
-            remote_script = f"/tmp/{script_local.name}.{int(time.time())}.sh"
-            shell_cmds.scp(str(script_local), node.host_spec.ip, node.host_spec.ssh_user, remote_script)
-            shell_cmds.ssh(node.host_spec.ip, node.host_spec.ssh_user, ["sudo", "bash", remote_script, str(node.index), docker_cmds.IMAGE_TAG])
-            shell_cmds.ssh(node.host_spec.ip, node.host_spec.ssh_user, ["rm", "-f", remote_script])
-            cnt1 = counter1.increment()
-            logger.debug(f"节点 {node.id} 已完成日志生成 ({cnt1}/{total_cnt})")
-            return node, True
-        except Exception as exc:
-            logger.warning(f"节点 {node.id} 日志生成遇到问题: {exc}")
-            return node, False
-
-    def _sync(node: RemoteNode) -> int:
-        try:
-            local_node_path = str(Path(local_path) / node.id)
-            Path(local_node_path).mkdir(parents=True, exist_ok=True)
-            remote_output_dir = f"{_archive_base(node.host_spec)}/output{node.index}/"
-            shell_cmds.rsync_download(remote_output_dir, local_node_path, node.host_spec.ip, user=node.host_spec.ssh_user)
-            cnt2 = counter2.increment()
-            logger.debug(f"节点 {node.id} 已完成日志同步 ({cnt2}/{total_cnt})")
-            return 0
-        except Exception as exc:
-            logger.warning(f"节点 {node.id} 日志同步遇到问题: {exc}")
-            return 1
-
-    with ThreadPoolExecutor(max_workers=128) as gen_executor:
-        gen_results = list(gen_executor.map(_generate, nodes))
-
-    gen_success_nodes = [n for n, ok in gen_results if ok]
-    gen_success_cnt = len(gen_success_nodes)
-    logger.info(f"日志生成阶段完成: 成功 {gen_success_cnt}/{total_cnt}，准备开始同步阶段")
-
-    with ThreadPoolExecutor(max_workers=32) as sync_executor:
-        sync_results = list(sync_executor.map(_sync, gen_success_nodes))
-
-    sync_failures = sum(sync_results)
-    sync_success_cnt = len(gen_success_nodes) - sync_failures
-    logger.info(f"日志同步完成: 成功 {sync_success_cnt}/{gen_success_cnt}（{sync_failures} 失败）")
-
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run a Conflux simulation on provisioned cloud instances")
     parser.add_argument("--log-prefix", default="logs", help="Base directory prefix for logs")
@@ -176,91 +126,97 @@ if __name__ == "__main__":
     if not hosts:
         raise RuntimeError("no hosts found in hosts.json")
 
-    default_key = root / "keys" / "ssh-key.pem"
-    if "SSH_KEY_PATH" not in os.environ and default_key.exists():
-        os.environ["SSH_KEY_PATH"] = str(default_key)
-
-    key_path = next((h.ssh_key_path for h in hosts if h.ssh_key_path), None)
-    if key_path and "SSH_KEY_PATH" not in os.environ:
-        os.environ["SSH_KEY_PATH"] = str(Path(key_path).expanduser())
-
-    total_nodes = sum(h.nodes_per_host for h in hosts)
-    max_nodes_per_host = max(h.nodes_per_host for h in hosts)
-    if total_nodes <= 0:
-        raise RuntimeError("no nodes scheduled to start")
-
-    simulation_config = SimulateOptions(
-        target_nodes=total_nodes,
-        # nodes_per_host=max_nodes_per_host,
-        num_blocks=1000,
-        connect_peers=8,
-        target_tps=17000,
-        storage_memory_gb=16,
-        generation_period_ms=175,
-    )
-    node_config = ConfluxOptions(
-        send_tx_period_ms=200,
-        tx_pool_size=2_000_000,
-        target_block_gas_limit=120_000_000,
-        max_block_size_in_bytes=450 * 1024,
-        txgen_account_count=500,
-    )
-    assert node_config.txgen_account_count * simulation_config.target_nodes <= 100_000
-
-    config_file = generate_config_file(simulation_config, node_config)
-    logger.success(f"完成配置文件 {config_file.path}")
-
-    log_path = f"{args.log_prefix}/{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
-    Path(log_path).mkdir(parents=True, exist_ok=True)
-
-    logger.info("准备分区内镜像拉取 (dockerhub -> zone peers -> local registry)")
-    prepare_images_by_zone(hosts)
-
-    nodes = launch_remote_nodes(hosts, config_file, pull_docker_image=False)
-    if len(nodes) < simulation_config.target_nodes:
-        # raise RuntimeError("Not all nodes started")
-        logger.warning(f"启动了{len(nodes)}个节点，少于预期的{simulation_config.target_nodes}个节点")
-        logger.warning("部分节点启动失败，继续进行测试")
-    else:
-        logger.success("所有节点已启动")
-    logger.info("准备连接拓扑网络")
-
-    topology = NetworkTopology.generate_random_topology(len(nodes), simulation_config.connect_peers)
-    for k, v in topology.peers.items():
-        peer_list = ", ".join([str(i) for i in v])
-        logger.debug(f"Node {nodes[k].id}({k}) has {len(v)} peers: {peer_list}")
-    min_peers = min(simulation_config.connect_peers, max(1, len(nodes) - 1))
-    connect_nodes(nodes, topology, min_peers=min_peers)
-    logger.success("拓扑网络构建完毕")
     try:
-        wait_for_nodes_synced(nodes)
-    except WaitUntilTimeoutError as exc:
-        logger.warning(f"等待节点同步超时: {exc}")
+        default_key = root / "keys" / "ssh-key.pem"
+        if "SSH_KEY_PATH" not in os.environ and default_key.exists():
+            os.environ["SSH_KEY_PATH"] = str(default_key)
+
+        key_path = next((h.ssh_key_path for h in hosts if h.ssh_key_path), None)
+        if key_path and "SSH_KEY_PATH" not in os.environ:
+            os.environ["SSH_KEY_PATH"] = str(Path(key_path).expanduser())
+
+        total_nodes = sum(h.nodes_per_host for h in hosts)
+        max_nodes_per_host = max(h.nodes_per_host for h in hosts)
+        if total_nodes <= 0:
+            raise RuntimeError("no nodes scheduled to start")
+
+        simulation_config = SimulateOptions(
+            target_nodes=total_nodes,
+            # nodes_per_host=max_nodes_per_host,
+            num_blocks=1000,
+            connect_peers=8,
+            target_tps=17000,
+            storage_memory_gb=16,
+            generation_period_ms=175,
+        )
+        node_config = ConfluxOptions(
+            send_tx_period_ms=200,
+            tx_pool_size=2_000_000,
+            target_block_gas_limit=120_000_000,
+            max_block_size_in_bytes=450 * 1024,
+            txgen_account_count=500,
+        )
+        assert node_config.txgen_account_count * simulation_config.target_nodes <= 100_000
 
-    try:
-        init_tx_gen(nodes, node_config.txgen_account_count)
-    except Exception as exc:
-        logger.warning(f"交易生成初始化异常: {exc}")
-    logger.success("开始运行区块链系统")
-    try:
-        generate_blocks_async(
-            nodes,
-            simulation_config.num_blocks,
-            node_config.max_block_size_in_bytes,
-            simulation_config.generation_period_ms,
-            min_node_interval_ms=10,
+        config_file = generate_config_file(simulation_config, node_config)
+        logger.success(f"完成配置文件 {config_file.path}")
+
+        log_path = f"{args.log_prefix}/{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}"
+        Path(log_path).mkdir(parents=True, exist_ok=True)
+
+        logger.info("准备分区内镜像拉取 (dockerhub -> zone peers -> local registry)")
+        # 每个 zone 镜像准备完成后立即启动该 zone 的节点
+        zone_nodes = prepare_images_by_zone(
+            hosts,
+            on_zone_ready=lambda zone_hosts: launch_remote_nodes(zone_hosts, config_file, pull_docker_image=False),
         )
-    except Exception as exc:
-        logger.warning(f"出块过程出现异常: {exc}")
-    logger.info(f"Node goodput: {nodes[0].rpc.test_getGoodPut()}")
+        nodes = list(chain.from_iterable(zone_nodes))
+        if len(nodes) < simulation_config.target_nodes:
+            # raise RuntimeError("Not all nodes started")
+            logger.warning(f"启动了{len(nodes)}个节点，少于预期的{simulation_config.target_nodes}个节点")
+            logger.warning("部分节点启动失败，继续进行测试")
+        else:
+            logger.success("所有节点已启动")
+        logger.info("准备连接拓扑网络")
+
+        topology = NetworkTopology.generate_random_topology(len(nodes), simulation_config.connect_peers)
+        for k, v in topology.peers.items():
+            peer_list = ", ".join([str(i) for i in v])
+            logger.debug(f"Node {nodes[k].id}({k}) has {len(v)} peers: {peer_list}")
+        min_peers = min(simulation_config.connect_peers, max(1, len(nodes) - 1))
+        connect_nodes(nodes, topology, min_peers=min_peers)
+        logger.success("拓扑网络构建完毕")
+        try:
+            wait_for_nodes_synced(nodes)
+        except WaitUntilTimeoutError as exc:
+            logger.warning(f"等待节点同步超时: {exc}")
 
-    try:
-        wait_for_nodes_synced(nodes)
-        logger.success("测试完毕，准备采集日志数据")
-    except WaitUntilTimeoutError:
-        logger.warning("部分节点没有完全同步，准备采集日志数据")
-
-    logger.info(f"Node goodput: {nodes[0].rpc.test_getGoodPut()}")
-    collect_logs(nodes, log_path)
-    logger.success(f"日志收集完毕，路径 {os.path.abspath(log_path)}")
+        try:
+            init_tx_gen(nodes, node_config.txgen_account_count)
+        except Exception as exc:
+            logger.warning(f"交易生成初始化异常: {exc}")
+        logger.success("开始运行区块链系统")
+        try:
+            generate_blocks_async(
+                nodes,
+                simulation_config.num_blocks,
+                node_config.max_block_size_in_bytes,
+                simulation_config.generation_period_ms,
+                min_node_interval_ms=10,
+            )
+        except Exception as exc:
+            logger.warning(f"出块过程出现异常: {exc}")
+        logger.info(f"Node goodput: {nodes[0].rpc.test_getGoodPut()}")
+
+        try:
+            wait_for_nodes_synced(nodes)
+            logger.success("测试完毕，准备采集日志数据")
+        except WaitUntilTimeoutError:
+            logger.warning("部分节点没有完全同步，准备采集日志数据")
+
+        logger.info(f"Node goodput: {nodes[0].rpc.test_getGoodPut()}")
+        collect_logs_v2(nodes, log_path, gen_workers=128, sync_workers=32)
+        logger.success(f"日志收集完毕，路径 {os.path.abspath(log_path)}")
+    finally:
+        shell_cmds.close_connections((h.ip, h.ssh_user) for h in hosts)
 
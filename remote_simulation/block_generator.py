@@ -2,25 +2,27 @@ from dataclasses import dataclass
 import math
 import re
 from typing import List, Optional
-from queue import Queue
+from collections import deque
+from queue import Empty, Queue
 import threading
 import time
 import random
 import logging
 
+import numpy as np
 from loguru import logger
 
 from remote_simulation.remote_node import RemoteNode
 from utils.wait_until import wait_until
 
-@dataclass
+@dataclass(slots=True)
 class BlockTask:
     """单个区块生成任务"""
     block_id: int
     node_id: str
-    scheduled_time: float  # 计划执行的绝对时间戳
+    scheduled_time: float  # 计划执行的时间点（time.monotonic）
 
-@dataclass
+@dataclass(slots=True)
 class BlockResult:
     """区块生成结果"""
     block_id: int
@@ -43,18 +45,27 @@ class BlockGenerationPlan:
     def generate(self) -> List[BlockTask]:
         """生成完整的出块计划"""
         tasks = []
-        current_time = time.time()
-        node_last_scheduled = {}  # 记录每个节点最后一次调度时间
+        min_interval_sec = self.min_node_interval_ms / 1000.0
+        # 计划时间单调递增，冷却中的节点按出块先后排队，到期后移回可用列表，每个区块只需 O(1) 选点
+        available_nodes = list(self.nodes.keys())
+        cooling_nodes = deque()  # (上次出块时间, node_id)
+
+        # 一次性生成全部出块时间间隔（指数分布），累加得到每个区块的计划时间
+        wait_secs = np.random.exponential(self.generation_period_ms / 1000, size=self.num_blocks)
+        scheduled_times = (time.monotonic() + np.cumsum(wait_secs)).tolist()
         
-        for i in range(self.num_blocks):
-            # 生成出块时间间隔（指数分布）
-            wait_sec = random.expovariate(1000 / self.generation_period_ms)
-            scheduled_time = current_time + wait_sec
-            
+        for i, scheduled_time in enumerate(scheduled_times):
             # 选择节点，确保该节点距离上次出块至少 min_node_interval_ms
-            node_id = self._select_available_node(
-                scheduled_time, node_last_scheduled
-            )
+            while cooling_nodes and scheduled_time - cooling_nodes[0][0] >= min_interval_sec:
+                available_nodes.append(cooling_nodes.popleft()[1])
+
+            if not available_nodes:
+                raise Exception("No node available, consider change the config")
+
+            # 随机取一个可用节点，与末尾交换后弹出
+            pick = random.randrange(len(available_nodes))
+            available_nodes[pick], available_nodes[-1] = available_nodes[-1], available_nodes[pick]
+            node_id = available_nodes.pop()
             
             tasks.append(BlockTask(
                 block_id=i + 1,
@@ -62,45 +73,21 @@ class BlockGenerationPlan:
                 scheduled_time=scheduled_time
             ))
             
-            node_last_scheduled[node_id] = scheduled_time
-            current_time = scheduled_time
+            cooling_nodes.append((scheduled_time, node_id))
             
         return tasks
     
-    def _select_available_node(self, scheduled_time: float, 
-                               node_last_scheduled: dict) -> str:
-        """选择一个可用节点（距离上次出块时间足够长）"""
-        min_interval_sec = self.min_node_interval_ms / 1000.0
-        available_nodes = []
-        
-        for node_id in self.nodes.keys():
-            last_time = node_last_scheduled.get(node_id, 0)
-            if scheduled_time - last_time >= min_interval_sec:
-                available_nodes.append(node_id)
-        
-        # 如果没有可用节点，选择距离上次出块时间最长的节点
-        if not available_nodes:
-            raise Exception("No node available, consider change the config")
-        
-        return random.choice(available_nodes)
-    
     def validate(self, tasks: List[BlockTask]) -> bool:
         """验证出块计划是否满足约束条件"""
         min_interval_sec = self.min_node_interval_ms / 1000.0
-        node_times = {}
+        node_last_time = {}
         
+        # 计划按时间递增生成，只需记录每个节点上一次出块时间，无需分组排序
         for task in tasks:
-            if task.node_id not in node_times:
-                node_times[task.node_id] = []
-            node_times[task.node_id].append(task.scheduled_time)
-        
-        # 检查每个节点的出块时间间隔
-        for node_id, times in node_times.items():
-            sorted_times = sorted(times)
-            for i in range(1, len(sorted_times)):
-                interval = sorted_times[i] - sorted_times[i-1]
-                if interval < min_interval_sec:
-                    return False
+            last_time = node_last_time.get(task.node_id)
+            if last_time is not None and task.scheduled_time - last_time < min_interval_sec:
+                return False
+            node_last_time[task.node_id] = task.scheduled_time
         
         return True
 
@@ -127,12 +114,21 @@ class ResultCollector:
         """
         处理队列中的所有结果，返回是否应该继续运行（失败次数未超限）
         """
-        while not self.result_queue.empty():
-            result: BlockResult = self.result_queue.get()
-            with self._lock:
+        # 先取空队列，再一次加锁批量处理
+        results: List[BlockResult] = []
+        while True:
+            try:
+                results.append(self.result_queue.get_nowait())
+            except Empty:
+                break
+        if not results:
+            return
+
+        with self._lock:
+            for result in results:
                 self._process_result(result)
-                if self.total_failures > self.max_failures:
-                    raise Exception(f"Too many block generation fails: {self.total_failures}")
+            if self.total_failures > self.max_failures:
+                raise Exception(f"Too many block generation fails: {self.total_failures}")
     
     def _process_result(self, result: BlockResult):
         self.total_completed += 1
@@ -195,7 +191,7 @@ class BlockGenerationScheduler:
 
     def _execute_next_task(self, task: BlockTask):
         # 等待到计划时间
-        current_time = time.time()
+        current_time = time.monotonic()
         wait_time = task.scheduled_time - current_time
 
         if wait_time > 0:
@@ -234,7 +230,7 @@ class BlockGenerationScheduler:
     def _report_progress(self, block_id: int, start_time: float):
         """报告进度"""
         stats = self.collector.get_stats()
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         
         logger.info(
             f"[PROGRESS] Block {block_id}: "
@@ -258,13 +254,15 @@ class BlockGenerationScheduler:
         )
 
 
+# 每个出块结果都要校验，模块加载时编译一次
+_HEX_HASH_PATTERN = re.compile(r'^0x[0-9a-f]{64}$')
+
+
 def is_hex_hash(input) -> bool:
     if type(input) is not str:
         return False
-    
-    pattern_strict = r'^0x[0-9a-f]{64}$'
 
-    return re.match(pattern_strict, input) is not None
+    return _HEX_HASH_PATTERN.match(input) is not None
 
 
 
@@ -278,13 +276,13 @@ class SimpleGenerateThread(threading.Thread):
 
     def run(self):
         try:
-            start = time.time()
+            start = time.monotonic()
             hash = self.node.rpc.test_generateOneBlock(10000000, self.max_block_size)
             
             if not is_hex_hash(hash):
                 raise Exception(f"Unexpected return valu {hash}")
 
-            rpc_time = round(time.time() - start, 3)
+            rpc_time = round(time.monotonic() - start, 3)
             logger.debug(f"node {self.node.id} generate block {hash}, rpc time {rpc_time}")
             success = True
             error_msg = None
@@ -313,7 +311,7 @@ class StatisticsReporter(threading.Thread):
         self.logger = logger
         self.interval_sec = interval_sec
         self.should_stop = threading.Event()
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         
     def run(self):
         while not self.should_stop.is_set():
@@ -323,7 +321,7 @@ class StatisticsReporter(threading.Thread):
     def _report(self):
         """输出当前统计"""
         stats = self.collector.get_stats()
-        elapsed = time.time() - self.start_time
+        elapsed = time.monotonic() - self.start_time
         
         self.logger.info(
             f"[STATS] Elapsed={elapsed:.1f}s, "
@@ -1,4 +1,5 @@
 from dataclasses import asdict, dataclass
+import os
 from remote_simulation.port_allocation import p2p_port, rpc_port, pubsub_port, remote_rpc_port, evm_rpc_port, evm_rpc_ws_port
 import conflux.config
 
@@ -52,18 +53,28 @@ class ConfluxOptions:
     public_rpc_apis: str = "cfx,debug,test,pubsub,trace"
 
 
+_config_file_cache: Dict[str, TempFile] = {}
+
+
 def generate_config_file(simulation_config: SimulateOptions, node_config: ConfluxOptions) -> TempFile:
+    # 相同配置复用已生成的文件
+    key = repr((simulation_config, node_config))
+    cached = _config_file_cache.get(key)
+    if cached is not None and os.path.exists(cached.path):
+        return cached
+
     config_dict = _generate_config_dict(simulation_config, node_config)
 
     config_file = TempFile()
+    # TempFile 每次写入都会 flush，拼好后一次写入
+    config_file.write("".join(f"{k}={v}\n" for k, v in config_dict.items()))
 
-    for k in config_dict:
-        config_file.writeline("{}={}".format(k, _normalize_config_value(config_dict[k])))
-
+    _config_file_cache[key] = config_file
     return config_file
 
 
 def _normalize_config_value(v: Any) -> str:
+    # conflux.config 中的值是 TOML 字面量字符串，需要先去掉引号并识别布尔值
     if type(v) is str:
         if v.startswith("'") and v.endswith("'"):
             v = v[1:-1]
@@ -73,7 +84,10 @@ def _normalize_config_value(v: Any) -> str:
             v = True
         elif v == "false":
             v = False
+    return _format_config_value(v)
+
 
+def _format_config_value(v: Any) -> str:
     if type(v) is bool:
         return str(v).lower()
     elif type(v) is str:
@@ -84,7 +98,7 @@ def _normalize_config_value(v: Any) -> str:
         raise Exception(f"Unrecongnized config type {type(v)} {v}")
     
 
-def _generate_config_dict(simulation_config: SimulateOptions, node_config: ConfluxOptions) -> Dict[str, str]:
+def _base_config_dict() -> Dict[str, str]:
     # for each node on the same host with different port number.
 
     # self.enable_tx_propagation = self.options.enable_tx_propagation
@@ -102,8 +116,18 @@ def _generate_config_dict(simulation_config: SimulateOptions, node_config: Confl
         # "pos_private_key_path": "'{}'".format(os.path.join(datadir, "blockchain_data", "net_config", "pos_key"))
     }
     config_dict.update(conflux.config.small_local_test_conf)
-    config_dict.update(_enact_node_config(simulation_config, node_config))
+    return {k: _normalize_config_value(v) for k, v in config_dict.items()}
+
+
+# 端口和测试基础配置与实验参数无关，模块加载时规整一次
+_BASE_CONFIG = _base_config_dict()
 
+
+def _generate_config_dict(simulation_config: SimulateOptions, node_config: ConfluxOptions) -> Dict[str, str]:
+    # 返回已规整的配置值，节点参数覆盖基础配置中的同名项
+    config_dict = dict(_BASE_CONFIG)
+    # 节点参数来自 dataclass，已经是 Python 类型，无需解析字面量
+    config_dict.update((k, _format_config_value(v)) for k, v in _enact_node_config(simulation_config, node_config).items())
     return config_dict
 
 def _enact_node_config(simulation_config: SimulateOptions, node_config: ConfluxOptions) -> Dict[str, str]:
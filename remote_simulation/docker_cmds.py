@@ -1,3 +1,7 @@
+from functools import lru_cache
+import re
+from typing import Iterable, Set
+
 from remote_simulation.port_allocation import p2p_port, rpc_port, pubsub_port, remote_rpc_port, evm_rpc_port, evm_rpc_ws_port
 
 # REMOTE_IMAGE_TAG = "public.ecr.aws/s9d3x9f5/conflux-massive-test/conflux-node:latest"
@@ -16,6 +20,8 @@ def container_name(index: int) -> str:
 def collect_log_container_name(index: int) -> str:
     return f"{CONTAINER_PREFIX}{index}"
 
+# The command only depends on the index, while every host asks for the same indices again.
+@lru_cache(maxsize=None)
 def launch_node(index: int) -> str:
     port_cmd = (
         f"-p {p2p_port(index)}:{p2p_port(0)}",
@@ -43,6 +49,16 @@ def launch_node(index: int) -> str:
 
     return " ".join(cmd_startup)
 
+LAUNCH_FAILED_MARKER = "CFX_LAUNCH_FAILED:"
+_LAUNCH_FAILED_PATTERN = re.compile(rf"{LAUNCH_FAILED_MARKER}(\d+)")
+
+def launch_nodes(indices: Iterable[int]) -> str:
+    # Start every node of a host in one SSH session; failed indices are echoed so the caller can skip them.
+    return " ; ".join(f"{{ {launch_node(i)} >/dev/null; }} || echo {LAUNCH_FAILED_MARKER}{i}" for i in indices)
+
+def parse_failed_launches(stdout: str) -> Set[int]:
+    return {int(m) for m in _LAUNCH_FAILED_PATTERN.findall(stdout or "")}
+
 def stop_node_and_collect_log(index: int, *, user = "ubuntu") -> str:
     stop_node = (
         f"sudo docker stop {container_name(index)} >/dev/null 2>&1 || true",
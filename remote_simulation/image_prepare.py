@@ -2,7 +2,7 @@ import ipaddress
 from collections import defaultdict
 from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, TypeVar
 
 from loguru import logger
 
@@ -138,17 +138,23 @@ def prepare_zone_images(zone_hosts: List[HostSpec], dockerhub_script: Path, regi
                 pass
 
 
-def prepare_images_by_zone(hosts: List[HostSpec]) -> None:
+T = TypeVar("T")
+
+
+def prepare_images_by_zone(hosts: List[HostSpec], on_zone_ready: Optional[Callable[[List[HostSpec]], T]] = None) -> List[Optional[T]]:
     dockerhub_script, registry_script = _script_paths()
 
     zones: Dict[str, List[HostSpec]] = defaultdict(list)
     for host in hosts:
         zones[host.zone].append(host)
 
+    # 各 zone 镜像就绪后立即执行后续步骤，不必等待最慢的 zone
+    def _prepare_zone(zone_hosts: List[HostSpec]) -> Optional[T]:
+        prepare_zone_images(zone_hosts, dockerhub_script, registry_script)
+        if on_zone_ready is None:
+            return None
+        return on_zone_ready(zone_hosts)
+
     with ThreadPoolExecutor(max_workers=min(32, max(1, len(zones)))) as executor:
-        futures = [
-            executor.submit(prepare_zone_images, zone_hosts, dockerhub_script, registry_script)
-            for zone_hosts in zones.values()
-        ]
-        for future in futures:
-            future.result()
+        futures = [executor.submit(_prepare_zone, zone_hosts) for zone_hosts in zones.values()]
+        return [future.result() for future in futures]
@@ -54,31 +54,25 @@ def launch_remote_nodes(host_specs: List[HostSpec], config_file: TempFile, *, pu
 
 
 def stop_remote_nodes(host_specs: List[HostSpec]):
-    def _stop_instance(ip_address: str, user: str):
-        try:
-            shell_cmds.ssh(ip_address, user, docker_cmds.stop_all_nodes())
-            logger.debug(f"实例 {ip_address} 已停止所有节点")
-            return 0
-        except Exception as e:
-            logger.warning(f"停止实例 {ip_address} 上节点遇到问题: {e}")
-            return 1
-
-    fail_cnt = sum(HOST_CONNECT_POOL.map(lambda spec: _stop_instance(spec.ip, spec.ssh_user), host_specs))
+    _run_on_all_hosts(host_specs, docker_cmds.stop_all_nodes(), "停止")
 
 
 def destory_remote_nodes(host_specs: List[HostSpec]):
-    def _stop_instance(ip_address: str, user: str):
+    _run_on_all_hosts(host_specs, docker_cmds.destory_all_nodes(), "销毁")
+
+
+def _run_on_all_hosts(host_specs: List[HostSpec], command: str, action: str) -> int:
+    # 命令只构造一次，各实例并行执行；返回失败实例数量
+    def _run(spec: HostSpec):
         try:
-            shell_cmds.ssh(ip_address, user, docker_cmds.destory_all_nodes())
-            logger.debug(f"实例 {ip_address} 已销毁所有节点")
+            shell_cmds.ssh(spec.ip, spec.ssh_user, command)
+            logger.debug(f"实例 {spec.ip} 已{action}所有节点")
             return 0
         except Exception as e:
-            logger.warning(f"停止实例 {ip_address} 上节点遇到问题: {e}")
+            logger.warning(f"{action}实例 {spec.ip} 上节点遇到问题: {e}")
             return 1
 
-    fail_cnt = sum(HOST_CONNECT_POOL.map(lambda spec: _stop_instance(spec.ip, spec.ssh_user), host_specs))
-
-    
+    return sum(HOST_CONNECT_POOL.map(_run, host_specs))
 
 
 def _execute_instance(host_spec: HostSpec, ctx: InstanceExecutionContext) -> List[RemoteNode]:
@@ -89,38 +83,39 @@ def _execute_instance(host_spec: HostSpec, ctx: InstanceExecutionContext) -> Lis
 
         shell_cmds.scp("./scripts/setup_image.sh", ip_address, user, "~/setup_image.sh")
         # logger.debug(f"实例 {ip_address} 上传初始化脚本完成")
-        shell_cmds.ssh(ip_address, user, "~/setup_image.sh")
-        # logger.debug(f"实例 {ip_address} 初始化完成")
         shell_cmds.scp(ctx.config_file.path, ip_address, user, "~/config.toml")
         # logger.debug(f"实例 {ip_address} 同步配置完成 ")
-        if ctx.pull_docker_image:
-            shell_cmds.ssh(ip_address, user, docker_cmds.pull_image())
-            logger.debug(f"实例 {ip_address} 拉取 docker 镜像完成")
+    except Exception as e:
+        logger.warning(f"无法上传文件到实例 {ip_address}: {e}")
+        return list()
 
-        # 清理之前实验的残留数据        
-        if ctx.clear_environment:
-            shell_cmds.ssh(ip_address, user, docker_cmds.destory_all_nodes())
-        
-        logger.debug(f"实例 {ip_address} 状态初始化完成，开始启动节点 ({get_global_counter("execute_5").increment()})")
+    # 初始化、拉取镜像、清理之前实验的残留数据、启动全部节点合并为一次 SSH 执行，再并行等待各节点就绪
+    # 初始化失败时不会启动节点，命令整体返回非零
+    remote_cmds = ["~/setup_image.sh"]
+    if ctx.pull_docker_image:
+        remote_cmds.append(docker_cmds.pull_image())
+    if ctx.clear_environment:
+        remote_cmds.append(docker_cmds.destory_all_nodes())
+    remote_cmds.append(docker_cmds.launch_nodes(range(host_spec.nodes_per_host)))
+    try:
+        result = shell_cmds.ssh(ip_address, user, " && ".join(f"{{ {cmd}; }}" for cmd in remote_cmds))
+        failed = docker_cmds.parse_failed_launches(result.stdout)
     except Exception as e:
-        logger.warning(f"无法初始化实例 {ip_address}: {e}")
+        logger.warning(f"实例 {ip_address} 初始化或节点启动失败：{e}")
         return list()
-    
-    launch_nodes_future = NODE_CONNECT_POOL.map(lambda index: _launch_node(host_spec, index, ctx.counter), range(host_spec.nodes_per_host))
+    logger.debug(f"实例 {ip_address} 节点启动命令执行完成 ({get_global_counter("execute_5").increment()})")
+    for index in sorted(failed):
+        logger.info(f"实例 {ip_address} 节点 {index} 启动失败")
+
+    launched = [index for index in range(host_spec.nodes_per_host) if index not in failed]
+    launch_nodes_future = NODE_CONNECT_POOL.map(lambda index: _wait_node_ready(host_spec, index, ctx.counter), launched)
     return [n for n in launch_nodes_future if n is not None]
 
 
 
-def _launch_node(host_spec: HostSpec, index: int, counter: AtomicCounter):
+def _wait_node_ready(host_spec: HostSpec, index: int, counter: AtomicCounter):
     ip_address = host_spec.ip
-    user = host_spec.ssh_user
 
-    try:
-        shell_cmds.ssh(ip_address, user, docker_cmds.launch_node(index))
-    except Exception as e:
-        logger.info(f"实例 {ip_address} 节点 {index} 启动失败：{e}")
-        return None
-    
     # TODO: 是否需要清理未成功启动的 node?
     
     if not test_say_hello(remote_rpc_port(index), ip_address):
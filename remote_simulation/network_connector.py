@@ -5,7 +5,7 @@ from loguru import logger
 
 from remote_simulation.network_topology import NetworkTopology
 from remote_simulation.peer_addressing import peer_p2p_address
-from remote_simulation.remote_node import RemoteNode
+from remote_simulation.remote_node import RemoteNode, RemoteNodeRPC
 from utils.wait_until import wait_until
 from utils.counter import get_global_counter
 
@@ -167,19 +167,21 @@ class NetworkConnector:
         """建立两个节点间的连接"""
         from_node = self.nodes[from_idx]
         to_node = self.nodes[to_idx]
+        # 同一连接的添加、握手轮询与延迟配置共用一个 RPC 客户端
+        rpc = from_node.rpc
 
-        from_node.rpc.test_addNode(to_node.key, peer_p2p_address(from_node, to_node))
-        wait_until(lambda: _check_handshake(from_node, to_node.key), timeout=self.handshake_timeout)
+        rpc.test_addNode(to_node.key, peer_p2p_address(from_node, to_node))
+        wait_until(lambda: _check_handshake(rpc, to_node.key), timeout=self.handshake_timeout)
 
         # 配置网络延迟
         if latency > 0:
-            from_node.rpc.test_addLatency(self.nodes[to_idx].key, latency)
+            rpc.test_addLatency(to_node.key, latency)
 
 
-def _check_handshake(node: RemoteNode, peer_key: str) -> bool:
+def _check_handshake(rpc: RemoteNodeRPC, peer_key: str) -> bool:
     """等待握手完成"""
 
-    peers = node.rpc.test_getPeerInfo()
+    peers = rpc.test_getPeerInfo()
     # Too many logs in thousands of 
     # logger.debug(f"{node.id} get peers {peer_key}, len {len(peers)}")
 
@@ -1,5 +1,6 @@
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property
 import random
 import time
 from typing import Any, Callable, List, Optional, Tuple, TypeVar
@@ -30,15 +31,19 @@ class RemoteNode:
 
     @property
     def rpc(self) -> 'RemoteNodeRPC':
+        return self.rpc_with_timeout(RemoteNodeRPC.timeout)
+
+    def rpc_with_timeout(self, timeout: int) -> 'RemoteNodeRPC':
         port = remote_rpc_port(self.index)
         client = HTTPClient(f"http://{self.host_spec.ip}:{port}")
-        return RemoteNodeRPC(host=self.host_spec.ip, port = port, client=client)
+        return RemoteNodeRPC(host=self.host_spec.ip, port = port, client=client, timeout=timeout)
     
-    @property
+    # id/desc 在日志和字典键中被反复使用，host_spec 与 index 创建后不变，缓存格式化结果
+    @cached_property
     def id(self) -> str:
         return f"{self.host_spec.ip}-{self.index}"
     
-    @property
+    @cached_property
     def desc(self) -> str:
         return f"{self.host_spec.ip}-{self.index} ({self.host_spec.provider}/{self.host_spec.zone})"
     
@@ -47,10 +52,13 @@ class RemoteNode:
         port = p2p_port(self.index)
         return f"{self.host_spec.ip}:{port}"
     
-    def wait_for_ready(self):
+    def wait_for_ready(self, probe_timeout: int = 5):
+        # Readiness probes run for every node in parallel; a short per-call timeout keeps one
+        # unresponsive host from pinning a worker for the default 60s RPC timeout per probe.
+        rpc = self.rpc_with_timeout(probe_timeout)
         try:
-            self._wait_for_node_id()
-            self._wait_for_phase(["NormalSyncPhase"])
+            self._wait_for_node_id(rpc)
+            self._wait_for_phase(["NormalSyncPhase"], rpc=rpc)
             return True
         except Exception as e:
             logger.debug(f"Fail to check node ready for {self.id}, error: {e}")
@@ -65,8 +73,8 @@ class RemoteNode:
             return False
 
 
-    def _wait_for_node_id(self):
-        pubkey, x, y = self._get_node_id()
+    def _wait_for_node_id(self, rpc: Optional['RemoteNodeRPC'] = None):
+        pubkey, x, y = self._get_node_id(rpc)
         self.key = eth_utils.encode_hex(pubkey)
         addr_tmp = bytearray(sha3(encode_int32(x) + encode_int32(y))[12:])
         addr_tmp[0] &= 0x0f
@@ -74,22 +82,23 @@ class RemoteNode:
         self.addr = addr_tmp
         logger.debug(f"Get nodeid {self.key} for instance {self.host_spec.ip} node {self.index}")
 
-    def _get_node_id(self):
+    def _get_node_id(self, rpc: Optional['RemoteNodeRPC'] = None):
         challenge = random.randint(0, 2**32-1)
-        signature = self.rpc.test_getNodeId(int_to_bytes(challenge))
+        signature = (rpc or self.rpc).test_getNodeId(int_to_bytes(challenge))
         return convert_to_nodeid(signature, challenge)
     
-    def _wait_for_phase(self, phases, wait_time=10):
+    def _wait_for_phase(self, phases, wait_time=10, rpc: Optional['RemoteNodeRPC'] = None):
+        rpc = rpc or self.rpc
         sleep_time = 0.1
         retry = 0
         max_retry = wait_time / sleep_time
 
-        while self.rpc.debug_currentSyncPhase() not in phases and retry <= max_retry:
+        while rpc.debug_currentSyncPhase() not in phases and retry <= max_retry:
             time.sleep(0.1)
             retry += 1
 
         if retry > max_retry:
-            current_phase = self.rpc.debug_currentSyncPhase()
+            current_phase = rpc.debug_currentSyncPhase()
             raise AssertionError(f"Node did not reach any of {phases} after {wait_time} seconds, current phase is {current_phase}")
 
 T = TypeVar('T')
@@ -1,6 +1,7 @@
 from collections import Counter
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+import re
 import threading
 import time
 from typing import List, Tuple
@@ -21,21 +22,25 @@ from collections import Counter, defaultdict
 
 def check_nodes_synced(executor: ThreadPoolExecutor, nodes: List[RemoteNode]):
     def get_best_block(node: RemoteNode):
+        rpc = node.rpc
         try: 
-            return node.rpc.cfx_getBestBlockHash()
+            return rpc.cfx_getBestBlockHash()
         except Exception as e:
-            logger.info(f"Fail to connect {node.rpc.addr}: {e}")
+            logger.info(f"Fail to connect {rpc.addr}: {e}")
             return None
 
     best_blocks = list(executor.map(get_best_block, nodes))
 
-    logger.debug("best blocks: {}".format(Counter(best_blocks).most_common(5)))
+    # 只统计一次，后面复用
+    block_counter = Counter(best_blocks)
+    logger.debug("best blocks: {}".format(block_counter.most_common(5)))
     
-    # 建立 block hash 到节点的映射
+    # 建立 block hash 到节点的映射；只有存在分叉时才需要
     block_to_nodes = defaultdict(list)
-    for node, block_hash in zip(nodes, best_blocks):
-        if block_hash is not None:
-            block_to_nodes[block_hash].append(node)
+    if len(block_counter) > 1:
+        for node, block_hash in zip(nodes, best_blocks):
+            if block_hash is not None:
+                block_to_nodes[block_hash].append(node)
     
     # 找出 cnt <= 5 的 block hash 及其对应的节点 id
     rare_blocks_info = [(block_hash, len(nodes), nodes) for block_hash, nodes in block_to_nodes.items() if len(nodes) <= 5]
@@ -45,7 +50,7 @@ def check_nodes_synced(executor: ThreadPoolExecutor, nodes: List[RemoteNode]):
         for (block_hash, cnt, nodes) in rare_blocks_info:
             logger.debug(f"  区块 {block_hash}: 出现 {cnt} 次, 节点 ID: {",".join([f"{node.id}({node.host_spec.provider}/{node.host_spec.zone})" for node in nodes])}")
     
-    most_common = Counter(best_blocks).most_common(1)
+    most_common = block_counter.most_common(1)
     if not most_common:
         logger.warning("无法获取任何节点的最佳区块")
         return False
@@ -104,7 +109,10 @@ def collect_logs(nodes: List[RemoteNode], local_path: str = "./logs", *, max_wor
     
     fail_cnt = sum(results)
     
-def collect_logs_v2(nodes: List[RemoteNode], local_path: str) -> None:
+COLLECT_FAILED_MARKER = "CFX_COLLECT_FAILED:"
+_COLLECT_FAILED_PATTERN = re.compile(rf"{COLLECT_FAILED_MARKER}(\d+)")
+
+def collect_logs_v2(nodes: List[RemoteNode], local_path: str, *, gen_workers: int = 2000, sync_workers: int = 64) -> None:
     total_cnt = len(nodes)
     counter1 = AtomicCounter()
     counter2 = AtomicCounter()
@@ -117,18 +125,32 @@ def collect_logs_v2(nodes: List[RemoteNode], local_path: str) -> None:
     def _archive_base(host: HostSpec) -> str:
         return "/root" if host.ssh_user == "root" else f"/home/{host.ssh_user}"
 
-    def _generate(node: RemoteNode) -> tuple[RemoteNode, bool]:
+    def _generate_host(host_nodes: List[RemoteNode]) -> List[tuple[RemoteNode, bool]]:
+        # 同一实例上的节点只上传一次脚本，并在一次 SSH 中并行生成日志；失败的节点输出标记
+        host = host_nodes[0].host_spec
+        remote_script = f"/tmp/{script_local.name}.{int(time.time())}.sh"
+        runs = " ".join(
+            f"{{ sudo bash {remote_script} {node.index} {docker_cmds.IMAGE_TAG} >/dev/null 2>&1 || echo {COLLECT_FAILED_MARKER}{node.index}; }} &"
+            for node in host_nodes
+        )
         try:
-            remote_script = f"/tmp/{script_local.name}.{int(time.time())}.sh"
-            shell_cmds.scp(str(script_local), node.host_spec.ip, node.host_spec.ssh_user, remote_script)
-            shell_cmds.ssh(node.host_spec.ip, node.host_spec.ssh_user, ["sudo", "bash", remote_script, str(node.index), docker_cmds.IMAGE_TAG])
-            shell_cmds.ssh(node.host_spec.ip, node.host_spec.ssh_user, ["rm", "-f", remote_script])
+            shell_cmds.scp(str(script_local), host.ip, host.ssh_user, remote_script)
+            result = shell_cmds.ssh(host.ip, host.ssh_user, f"{runs} wait; rm -f {remote_script}")
+            failed = {int(m) for m in _COLLECT_FAILED_PATTERN.findall(result.stdout or "")}
+        except Exception as exc:
+            logger.warning(f"实例 {host.ip} 日志生成遇到问题: {exc}")
+            return [(node, False) for node in host_nodes]
+
+        results = []
+        for node in host_nodes:
+            if node.index in failed:
+                logger.warning(f"节点 {node.id} 日志生成遇到问题")
+                results.append((node, False))
+                continue
             cnt1 = counter1.increment()
             logger.debug(f"节点 {node.id} 已完成日志生成 ({cnt1}/{total_cnt})")
-            return node, True
-        except Exception as exc:
-            logger.warning(f"节点 {node.id} 日志生成遇到问题: {exc}")
-            return node, False
+            results.append((node, True))
+        return results
 
     def _sync(node: RemoteNode) -> int:
         try:
@@ -143,16 +165,22 @@ def collect_logs_v2(nodes: List[RemoteNode], local_path: str) -> None:
             logger.warning(f"节点 {node.id} 日志同步遇到问题: {exc}")
             return 1
 
-    with ThreadPoolExecutor(max_workers=2000) as gen_executor:
-        gen_results = list(gen_executor.map(_generate, nodes))
+    nodes_by_host = defaultdict(list)
+    for node in nodes:
+        nodes_by_host[node.host_spec.ip].append(node)
 
-    gen_success_nodes = [n for n, ok in gen_results if ok]
-    gen_success_cnt = len(gen_success_nodes)
-    logger.info(f"日志生成阶段完成: 成功 {gen_success_cnt}/{total_cnt}，准备开始同步阶段")
+    # 某个实例的日志生成完毕后立即开始同步，生成和同步两个阶段相互重叠
+    with ThreadPoolExecutor(max_workers=sync_workers) as sync_executor:
+        sync_futures = []
+        with ThreadPoolExecutor(max_workers=gen_workers) as gen_executor:
+            gen_futures = [gen_executor.submit(_generate_host, host_nodes) for host_nodes in nodes_by_host.values()]
+            for future in as_completed(gen_futures):
+                sync_futures.extend(sync_executor.submit(_sync, node) for node, ok in future.result() if ok)
 
-    with ThreadPoolExecutor(max_workers=64) as sync_executor:
-        sync_results = list(sync_executor.map(_sync, gen_success_nodes))
+        gen_success_cnt = len(sync_futures)
+        logger.info(f"日志生成阶段完成: 成功 {gen_success_cnt}/{total_cnt}，等待剩余同步完成")
+        sync_results = [future.result() for future in sync_futures]
 
     sync_failures = sum(sync_results)
-    sync_success_cnt = len(gen_success_nodes) - sync_failures
+    sync_success_cnt = gen_success_cnt - sync_failures
     logger.info(f"日志同步完成: 成功 {sync_success_cnt}/{gen_success_cnt}（{sync_failures} 失败）")
\ No newline at end of file
@@ -3,6 +3,9 @@ set -euo pipefail
 
 INDEX="${1:?node index required}"
 IMAGE_TAG="${2:-conflux-node:latest}"
+# 7z level for the collected files. -mx=9 was the remote CPU bottleneck when every node on a host
+# compresses at once; -mx=5 is several times faster on text logs for a slightly larger archive.
+COMPRESS_LEVEL="${3:-5}"
 CONTAINER="conflux_node_${INDEX}"
 
 LOG_DIR="/root/log${INDEX}"
@@ -41,7 +44,8 @@ docker run --rm --name "${CONTAINER}_collect" \
 #   echo "Warning: 7z not available, skipping compression" >&2
 # fi
 
-find ${OUTPUT_BASE}/output${INDEX} -maxdepth 1 -type f -print0 | xargs -0 -P4 -I{} sh -c '7z a -t7z -mx=9 -m0=lzma2 -ms=on -bso0 -bsp0 "{}.7z" "{}" && rm -rf "{}"'
+# Files that are already compressed are kept as they are; re-packing them only burns CPU.
+find ${OUTPUT_BASE}/output${INDEX} -maxdepth 1 -type f ! -name '*.7z' ! -name '*.gz' ! -name '*.zst' ! -name '*.xz' -print0 | xargs -0 -P4 -I{} sh -c '7z a -t7z -mx='"${COMPRESS_LEVEL}"' -m0=lzma2 -ms=on -bso0 -bsp0 "{}.7z" "{}" && rm -rf "{}"'
 
 
 # Remove uncompressed output to save space only if the archive was successfully created
@@ -1,8 +1,31 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-apt-get update -y
-apt-get install -y docker.io ca-certificates curl p7zip-full
+# retry <attempts> <base_delay> cmd...: exponential backoff with a little jitter.
+# Intentionally duplicated in prepare_docker_server_image_tencent.sh: the image builders scp this file alone and
+# run it, so it cannot source a sibling helper.
+retry() {
+  local n=0 max=$1 base=$2
+  shift 2
+  until "$@"; do
+    n=$((n + 1))
+    [ "$n" -ge "$max" ] && return 1
+    sleep $((base * 2 ** (n - 1) + RANDOM % 3))
+  done
+}
+
+cat >/etc/apt/apt.conf.d/99no-translations <<'APTCONF'
+Acquire::Languages "none";
+APTCONF
+
+# No upgrade and no recommends: security patches come with the base image bump.
+# pigz is a docker.io recommend worth keeping for faster layer decompression.
+apt_install() {
+  apt-get update -y && apt-get install -y --no-install-recommends docker.io ca-certificates curl p7zip-full pigz
+}
+retry 4 2 apt_install
+apt-get -y autoremove
+apt-get -y clean
 if ! command -v 7zz >/dev/null 2>&1; then
   if command -v 7z >/dev/null 2>&1; then
     ln -sf /usr/bin/7z /usr/bin/7zz || true
@@ -11,7 +34,13 @@ fi
 systemctl enable --now docker
 
 mkdir -p /opt/registry/data
-docker pull registry:2
+# The two pulls are independent, so overlap them; `wait` propagates failures under set -e.
+retry 5 3 docker pull registry:2 &
+registry_pull=$!
+retry 5 3 docker pull lylcx2007/conflux-node:latest &
+node_pull=$!
+
+wait "$registry_pull"
 docker rm -f conflux-registry >/dev/null 2>&1 || true
 docker run -d --restart=always \
 	--name conflux-registry \
@@ -19,12 +48,10 @@ docker run -d --restart=always \
 	-v /opt/registry/data:/var/lib/registry \
 	registry:2
 
-docker pull lylcx2007/conflux-node:latest
+wait "$node_pull"
 docker tag lylcx2007/conflux-node:latest conflux-node:base
 docker tag conflux-node:base localhost:5000/conflux-node:base
 docker push localhost:5000/conflux-node:base
 
-docker pull localhost:5000/conflux-node:base
-
 echo "LABEL=cloudimg-rootfs / ext4 defaults,noatime,nodiratime,barrier=0 0 0" > /tmp/fstab
 cp /tmp/fstab /etc/fstab
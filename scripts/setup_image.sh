@@ -6,13 +6,13 @@
 # sudo cp fstab /etc/fstab
 
 # Configure ulimit settings for current user
-echo "ulimit -n 65535" >> ~/.profile
 # Cannot assign a value more than half of `/proc/sys/kernel/threads-max`, which is about 120,000.
-echo "ulimit -u 60000" >> ~/.profile
+printf '%s\n' "ulimit -n 65535" "ulimit -u 60000" >> ~/.profile
 
 # Configure system-wide resource limits
-echo "*            -          nproc     65535 " | sudo tee -a /etc/security/limits.conf
-echo "*            -          nfile     65535 " | sudo tee -a /etc/security/limits.conf
+printf '%s\n' \
+    "*            -          nproc     65535 " \
+    "*            -          nfile     65535 " | sudo tee -a /etc/security/limits.conf
 
 # Configure systemd task limits
 echo "DefaultTasksMax=65535" | sudo tee -a /etc/systemd/system.conf
@@ -1,24 +1,26 @@
-import threading
+import itertools
 
 class AtomicCounter:
     def __init__(self):
         self.value = 0
-        self._lock = threading.Lock()
+        # next() on itertools.count runs in C and cannot be interleaved under the GIL,
+        # so every increment gets a distinct value without taking a lock.
+        self._counter = itertools.count(1)
 
     def increment(self):
-        with self._lock:
-            self.value += 1
-            return self.value
+        value = next(self._counter)
+        self.value = value
+        return value
 
     def get(self):
-        with self._lock:
-            return self.value
+        # Latest value handed out; may briefly trail increments racing on other threads.
+        return self.value
         
 _counters = {}
-_global_lock = threading.Lock()
 
 def get_global_counter(key: str):
-    with _global_lock:
-        if key not in _counters:
-            _counters[key] = AtomicCounter()
-        return _counters[key]
\ No newline at end of file
+    counter = _counters.get(key)
+    if counter is None:
+        # dict.setdefault is atomic, so racing callers still end up sharing one counter
+        counter = _counters.setdefault(key, AtomicCounter())
+    return counter
\ No newline at end of file
@@ -1,7 +1,8 @@
 import os
 import subprocess
+import tempfile
 import time
-from typing import List
+from typing import Iterable, List, Tuple
 
 from loguru import logger
 
@@ -12,6 +13,22 @@ def _ssh_key_args() -> List[str]:
         return []
     return ["-i", key_path]
 
+# 同一实例的 ssh/scp/rsync 复用一条主连接，后续会话不再重复握手和认证
+# 主连接需要跨过实验运行阶段，保留到日志采集结束，由 close_connections 主动关闭
+_SSH_CONTROL_ARGS = [
+    "-o", "ControlMaster=auto",
+    "-o", f"ControlPath={os.path.join(tempfile.gettempdir(), 'cfx-ssh-%C')}",
+    "-o", "ControlPersist=2h",
+]
+
+def _ssh_common_args() -> List[str]:
+    return [
+        '-o', 'StrictHostKeyChecking=no',
+        "-o", "UserKnownHostsFile=/dev/null",
+        *_SSH_CONTROL_ARGS,
+        *_ssh_key_args(),
+    ]
+
 def scp(
     script_path: str,
     ip_address: str,
@@ -23,9 +40,7 @@ def scp(
 ):
     scp_cmd = [
         'scp',
-        '-o', 'StrictHostKeyChecking=no',
-        "-o", "UserKnownHostsFile=/dev/null",
-        *_ssh_key_args(),
+        *_ssh_common_args(),
         script_path,
         f'{user}@{ip_address}:{remote_path}'
     ]
@@ -42,8 +57,6 @@ def scp(
                 raise
 
 def rsync_download(remote_path: str, local_path: str, ip_address: str, *, user: str = "ubuntu", compress_level: int = 12, max_retries: int = 3):
-    key_args = _ssh_key_args()
-    key_opt = "" if not key_args else f" -i {key_args[1]}"
     rsync_cmd = [
         'rsync',
         '-az',  # -a: archive mode, -v: verbose, -z: compress
@@ -53,7 +66,7 @@ def rsync_download(remote_path: str, local_path: str, ip_address: str, *, user:
         f'--compress-level={compress_level}',
         '--partial',
         '--stats',
-        '-e', f'ssh -o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null{key_opt}',  # SSH 选项
+        '-e', " ".join(['ssh', *_ssh_common_args()]),  # SSH 选项
         f'{user}@{ip_address}:{remote_path}',
         local_path,
     ]
@@ -94,9 +107,7 @@ def ssh(ip_address: str, user: str = "ubuntu", command: str | List[str] | None =
 
     ssh_cmd = [
         'ssh',
-        '-o', 'StrictHostKeyChecking=no',
-        "-o", "UserKnownHostsFile=/dev/null",
-        *_ssh_key_args(),
+        *_ssh_common_args(),
         f'{user}@{ip_address}',
         *command
     ]
@@ -111,4 +122,10 @@ def ssh(ip_address: str, user: str = "ubuntu", command: str | List[str] | None =
                 time.sleep(retry_delay)
             else:
                 logger.debug(f"{ip_address} SSH 失败，已达到最大重试次数")
-                raise
\ No newline at end of file
+                raise
+
+
+def close_connections(hosts: Iterable[Tuple[str, str]]):
+    """关闭 (ip, user) 对应的复用主连接；只访问本地控制套接字，没有主连接时直接忽略"""
+    for ip_address, user in set(hosts):
+        subprocess.run(['ssh', *_SSH_CONTROL_ARGS, '-O', 'exit', f'{user}@{ip_address}'], capture_output=True)
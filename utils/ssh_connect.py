@@ -0,0 +1,30 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+import asyncssh
+
+
+async def connect_ssh(
+    host: str,
+    user: str,
+    key: str,
+    timeout: int,
+    interval: float = 3,
+    max_interval: float = 20,
+    connect_timeout: float = 10,
+) -> asyncssh.SSHClientConnection:
+    """Retry with backoff until SSH is ready on a host and return the open connection."""
+    deadline = time.monotonic() + timeout
+    last_exc: Optional[BaseException] = None
+    while time.monotonic() < deadline:
+        try:
+            return await asyncssh.connect(
+                host, username=user, client_keys=[key], known_hosts=None, connect_timeout=connect_timeout
+            )
+        except Exception as exc:
+            last_exc = exc
+            await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+            interval = min(max_interval, interval * 1.3 + random.uniform(0, 0.5))
+    raise TimeoutError(f"SSH not ready for {host}; last error: {last_exc}")
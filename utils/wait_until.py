@@ -1,4 +1,5 @@
 import inspect
+import random
 import time
 
 from loguru import logger
@@ -6,6 +7,10 @@ from loguru import logger
 class WaitUntilTimeoutError(Exception):
     pass
 
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Truncated exponential backoff with jitter for the given 0-based retry attempt."""
+    return min(cap, base * (2 ** attempt)) * (0.5 + random.random() * 0.5)
+
 def wait_until(predicate,
                *,
                attempts=float('inf'),
@@ -15,9 +20,10 @@ def wait_until(predicate,
     if attempts == float('inf') and timeout == float('inf'):
         timeout = 60
     attempt = 0
-    time_end = time.time() + timeout
+    # 单调时钟，不受系统时间校正影响
+    time_end = time.monotonic() + timeout
 
-    while attempt < attempts and time.time() < time_end:
+    while attempt < attempts and time.monotonic() < time_end:
         if lock:
             with lock:
                 if predicate():
@@ -36,7 +42,7 @@ def wait_until(predicate,
         raise WaitUntilTimeoutError(
             "Predicate {} not true after {} attempts".format(
                 predicate_source, attempts))
-    elif time.time() >= time_end:
+    elif time.monotonic() >= time_end:
         raise WaitUntilTimeoutError(
             "Predicate {} not true after {} seconds".format(
                 predicate_source, timeout))